@@ -3,7 +3,15 @@
      models.
 """
 
+from .labelbuffer import *
+from .inputcache import *
 from .fuzzyart import *
 from .topoart import *
 from .hypersphereart import *
 from .hyperspheretopoart import *
+from .inferenceserver import *
+from .concurrentmodel import *
+from .clusterstatistics import *
+from .parametersweep import *
+from .vigilanceladder import *
+from .hierarchicaltopoart import *
@@ -0,0 +1,155 @@
+"""
+    ARTPY: A Python library of Adaptive Resonance Theory based learning
+     models.
+
+    This file provides ClusterStatistics class.
+"""
+
+from typing import Dict, Optional
+import numpy as np
+from ..functions import *
+
+__author__ = "Raghu Yelugam"
+__copyright__ = "Copyright 2023"
+__credits__ = ["Leonardo Enzo Brito Da Silva", "Donald Wunsch"]
+__license__ = "GPL"
+__version__ = "0.0.1"
+__maintainer__ = "Raghu Yelugam"
+__email__ = "ry222@mst.edu"
+__status__ = "Release"
+__date__ = "2023.04.13"
+
+
+class ClusterStatistics:
+    """
+    Streaming sufficient statistics of a clustering: the number, sum and
+    sum of squared norms of the samples of every category and, when the
+    ground truth is given, the contingency table of the labels and the
+    truth. They are updated batch by batch, so the internal metrics
+    (Davies-Bouldin, Calinski-Harabasz, category utilisation) and the
+    external ones (ARI, NMI) of a stream are available at any time
+    without retaining its samples. Samples labelled -1 (e.g. by pruned
+    TopoART prototypes) are left out of the internal metrics and form
+    their own cluster in the external ones.
+    """
+
+    def __init__(self) -> None:
+        self.nsamples_: int = 0
+        self.counts_: np.ndarray = np.zeros(0, dtype=np.int64)
+        self.sums_: np.ndarray = np.zeros((0, 0))
+        self.sqsums_: np.ndarray = np.zeros(0)
+        self.table_: np.ndarray = np.zeros((0, 0), dtype=np.int64)
+
+    def __repr__(self) -> str:
+        n = self.nsamples_
+        k = np.count_nonzero(self.counts_)
+        return f"ClusterStatistics(samples = {n}, categories = {k})"
+
+    def update(self,
+               inputs: np.ndarray,
+               labels: np.ndarray,
+               truth: Optional[np.ndarray] = None) -> None:
+        """
+        :param inputs: the samples, one per row
+        :param labels: label of every sample, -1 for none
+        :param truth: non negative ground truth label of every sample
+        """
+        inputs = np.asarray(inputs, dtype=float)
+        labels = np.asarray(labels, dtype=np.int64)
+        self.nsamples_ += len(labels)
+        if truth is not None:
+            self.__tabulate(labels + 1, np.asarray(truth, dtype=np.int64))
+
+        assigned = labels >= 0
+        inputs = inputs[assigned]
+        labels = labels[assigned]
+        if len(labels) == 0:
+            return
+        nCategories = max(len(self.counts_), labels.max() + 1)
+        if len(self.sums_) == 0:
+            self.sums_ = np.zeros((0, inputs.shape[1]))
+        if nCategories > len(self.counts_):
+            grow = nCategories - len(self.counts_)
+            self.counts_ = np.concatenate((self.counts_, np.zeros(grow, dtype=np.int64)))
+            self.sums_ = np.concatenate((self.sums_, np.zeros((grow, inputs.shape[1]))))
+            self.sqsums_ = np.concatenate((self.sqsums_, np.zeros(grow)))
+
+        self.counts_ += np.bincount(labels, minlength=nCategories)
+        self.sqsums_ += np.bincount(labels,
+                                    weights=np.sum(inputs**2, axis=1),
+                                    minlength=nCategories)
+        order = np.argsort(labels, kind="stable")
+        labels = labels[order]
+        starts = np.flatnonzero(np.r_[True, labels[1:] != labels[:-1]])
+        self.sums_[labels[starts]] += np.add.reduceat(inputs[order], starts, axis=0)
+
+    def __tabulate(self,
+                   rows: np.ndarray,
+                   cols: np.ndarray) -> None:
+        """
+        :param rows: labels shifted by one so that -1 is row 0
+        :param cols: ground truth labels
+        """
+        if len(rows) == 0:
+            return
+        shape = (max(self.table_.shape[0], rows.max() + 1),
+                 max(self.table_.shape[1], cols.max() + 1))
+        if shape != self.table_.shape:
+            table = np.zeros(shape, dtype=np.int64)
+            table[:self.table_.shape[0], :self.table_.shape[1]] = self.table_
+            self.table_ = table
+        np.add.at(self.table_, (rows, cols), 1)
+
+    def daviesbouldin(self,
+                      centres: Optional[np.ndarray] = None) -> float:
+        """
+        :param centres: centre of every category, e.g. boxcentres of the
+                prototypes, the mean of its samples when None
+        """
+        return daviesbouldin(self.counts_, self.sums_, self.sqsums_,
+                             None if centres is None else centres[:len(self.counts_)])
+
+    def calinskiharabasz(self,
+                         centres: Optional[np.ndarray] = None) -> float:
+        """
+        :param centres: centre of every category, the mean of its samples
+                when None
+        """
+        return calinskiharabasz(self.counts_, self.sums_, self.sqsums_,
+                                None if centres is None else centres[:len(self.counts_)])
+
+    def utilisation(self,
+                    nCategories: Optional[int] = None) -> Dict[str, float]:
+        """
+        :param nCategories: number of categories of the model, the highest
+                label seen plus one when None
+        """
+        counts = self.counts_
+        if nCategories is not None and nCategories > len(counts):
+            counts = np.concatenate((counts, np.zeros(nCategories - len(counts))))
+        return categoryutilisation(counts)
+
+    def adjustedrandindex(self) -> float:
+        return adjustedrandindex(self.table_)
+
+    def normalisedmutualinfo(self) -> float:
+        return normalisedmutualinfo(self.table_)
+
+    def summary(self,
+                nCategories: Optional[int] = None,
+                centres: Optional[np.ndarray] = None) -> Dict[str, float]:
+        """
+        :param nCategories: see utilisation
+        :param centres: see daviesbouldin
+        returns all the metrics available, ARI and NMI only when ground
+        truth was given
+        """
+        utilisation = self.utilisation(nCategories)
+        metrics = {"daviesbouldin": self.daviesbouldin(centres),
+                   "calinskiharabasz": self.calinskiharabasz(),
+                   "utilisation": utilisation["used"],
+                   "sizeentropy": utilisation["entropy"]}
+        if self.table_.size > 0:
+            metrics["ari"] = self.adjustedrandindex()
+            metrics["nmi"] = self.normalisedmutualinfo()
+        return metrics
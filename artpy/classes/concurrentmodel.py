@@ -0,0 +1,149 @@
+"""
+    ARTPY: A Python library of Adaptive Resonance Theory based learning
+     models.
+
+    This file provides ConcurrentModel class.
+"""
+
+import itertools
+import threading
+from typing import Any, Iterable, Optional
+import numpy as np
+from ..functions import *
+
+__author__ = "Raghu Yelugam"
+__copyright__ = "Copyright 2023"
+__credits__ = ["Leonardo Enzo Brito Da Silva", "Donald Wunsch"]
+__license__ = "GPL"
+__version__ = "0.0.1"
+__maintainer__ = "Raghu Yelugam"
+__email__ = "ry222@mst.edu"
+__status__ = "Release"
+__date__ = "2023.04.13"
+
+
+class ConcurrentModel:
+    """
+    Lets an ART model (FuzzyART, TopoART) be queried while it learns. A
+    single writer feeds samples to the model through learn, learnbatch,
+    fit or start, and every publishevery_ samples a read-only snapshot of
+    the model is published. Readers call predict, which only dereferences
+    the latest published snapshot, so neither side ever takes a lock and
+    a reader never observes a half-applied update or a prune in progress.
+    """
+
+    def __init__(self,
+                 model_: Any,
+                 publishevery_: Optional[int] = None) -> None:
+        """
+        :param model_: the model to be trained, it must provide snapshot
+        :param publishevery_: number of samples between published
+                snapshots, the model's tau_ when None so TopoART
+                snapshots are taken right after pruning, 1000 for models
+                without tau_ such as FuzzyART
+        """
+        if publishevery_ is None:
+            publishevery_ = getattr(model_, "tau_", 1000)
+        if publishevery_ < 1:
+            error = f"expected publishevery_ >= 1, got {publishevery_}"
+            raise ValueError(error)
+        self.model_ = model_
+        self.publishevery_: int = publishevery_
+        self.version_: int = 0
+        self.nlearnt_: int = 0
+        self.snapshot_ = None
+        self.__unpublished: int = 0
+        self.publish()
+
+    def __repr__(self) -> str:
+        m = type(self.model_).__name__
+        p = self.publishevery_
+        v = self.version_
+        return f"ConcurrentModel(model = {m}, publishevery = {p}, version = {v})"
+
+    def publish(self) -> None:
+        """
+        publish a snapshot of the model as it is now
+        """
+        self.snapshot_ = self.model_.snapshot()
+        self.version_ += 1
+        self.__unpublished = 0
+
+    def __learnt(self,
+                 nSamples: int) -> None:
+        """
+        :param nSamples: number of samples just learnt by the model
+        """
+        self.nlearnt_ += nSamples
+        self.__unpublished += nSamples
+        if self.__unpublished >= self.publishevery_:
+            self.publish()
+
+    def learn(self,
+              input: np.ndarray) -> None:
+        """
+        :param input: the input vector to be fed the ART model
+        """
+        self.model_.learn(input)
+        self.__learnt(1)
+
+    def learnbatch(self,
+                   inputs: np.ndarray) -> None:
+        """
+        :param inputs: the input vectors to be fed the ART model at once,
+                see the model's learnbatch
+        """
+        self.model_.learnbatch(inputs)
+        self.__learnt(len(inputs))
+
+    def fit(self,
+            data: Iterable[np.ndarray],
+            batchsize: int = 1) -> None:
+        """
+        :param data: input vectors in the form accepted by the model's
+                learn, i.e. complement coded for TopoART
+        :param batchsize: number of observations learnt at once, a batch
+                never straddles a publication. Iterables other than
+                arrays are consumed one batch at a time, so data may be
+                a stream
+        """
+        if batchsize > 1 and (isinstance(data, np.ndarray) or issparse(data)):
+            data = sparserows(data) if issparse(data) else data
+            start = 0
+            while start < data.shape[0]:
+                step = min(batchsize, self.publishevery_ - self.__unpublished)
+                self.learnbatch(data[start:start + step])
+                start += step
+        elif batchsize > 1:
+            data = iter(data)
+            while True:
+                step = min(batchsize, self.publishevery_ - self.__unpublished)
+                batch = list(itertools.islice(data, step))
+                if len(batch) == 0:
+                    break
+                self.learnbatch(np.stack([np.asarray(val) for val in batch]))
+        else:
+            for val in data:
+                self.learn(val)
+        self.publish()
+
+    def start(self,
+              data: Iterable[np.ndarray],
+              batchsize: int = 1) -> threading.Thread:
+        """
+        :param data: input vectors, see fit
+        :param batchsize: see fit
+        returns the writer thread running fit on data
+        """
+        writer = threading.Thread(target=self.fit,
+                                  args=(data, batchsize),
+                                  daemon=True)
+        writer.start()
+        return writer
+
+    def predict(self,
+                inputs: np.ndarray) -> np.ndarray:
+        """
+        :param inputs: input(s) to be classified with the latest snapshot
+        """
+        return self.snapshot_.predict(inputs)
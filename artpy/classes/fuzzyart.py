@@ -6,8 +6,12 @@
 """
 
 import os
+import copy
 import numpy as np
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
+from ..functions import *
+from .labelbuffer import LabelBuffer
+from .inputcache import InputCache
 
 __author__ = "Raghu Yelugam"
 __copyright__ = "Copyright 2023"
@@ -27,22 +31,84 @@ class FuzzyART:
        patterns by an adaptive resonance system. Neural networks, 4(6),
        pp.759-771.
 
+       The inputs are complement coded vectors, or scipy.sparse rows a in
+       [0, 1]^d standing for [a, 1 - a] (see complementcoding), whose
+       choice and match cost O(K nnz) instead of O(K d).
     """
 
     def __init__(self,
                  vigilance_: float,
                  alpha_: float,
-                 beta_: float) -> None:
+                 beta_: float,
+                 labelstorage_: str = "memory",
+                 labelpath_: Optional[str] = None,
+                 maxcategories_: Optional[int] = None,
+                 maxmemory_: Optional[int] = None,
+                 eviction_: str = "lru",
+                 cachesize_: int = 0,
+                 cachestep_: float = 0.0,
+                 cachetol_: float = 0.0,
+                 nthreads_: int = 1) -> None:
         """
         :param vigilance_: vigilance value for training the ART model
         :param alpha_: The parameter for the choice function evaluation
         :param beta_: Learning rate for training the Fuzzy ART model
+        :param labelstorage_: where the per-sample labels are kept, one of
+                "memory", "memmap" or "none" (see LabelBuffer)
+        :param labelpath_: file backing the labels when labelstorage_ is
+                "memmap"
+        :param maxcategories_: maximum number of categories, unbounded
+                when None
+        :param maxmemory_: maximum number of bytes held by the categories
+                and their statistics, unbounded when None
+        :param eviction_: category replaced by a new one once a limit is
+                reached, one of "lru", "count" or "oldest" (see
+                selectvictim). The evicted category's index is reused,
+                so earlier labels with that index refer to the old one.
+        :param cachesize_: number of recent inputs whose resonating
+                category is cached (see InputCache), so that learning a
+                repeated input skips the choice and match of all the
+                categories. The cached categories are dropped as soon
+                as any category is created, evicted or has moved by
+                more than cachetol_, so that a hit returns the winner
+                of the full search up to cachetol_. A cached category
+                failing vigilance counts as a miss and the full search
+                runs, no cache when 0
+        :param cachestep_: quantisation step of the cache keys, so that
+                inputs closer than it may share an entry, exact
+                duplicates only when 0
+        :param cachetol_: total weight change (L1) a category may
+                accumulate before the cache entries are invalidated
+        :param nthreads_: number of threads evaluating the choice and
+                match of blocks of categories in parallel (see
+                blockfuzzyand), worthwhile for very many categories
         """
+        if eviction_ not in EVICTIONPOLICIES:
+            error = f"expected eviction_ in {EVICTIONPOLICIES}, got {eviction_}"
+            raise ValueError(error)
         self.vigilance_ = vigilance_
         self.alpha_ = alpha_
         self.beta_ = beta_
-        self.prototypes: List[np.ndarray] = []
-        self.labels_: List[int] = []
+        self.maxcategories_ = maxcategories_
+        self.maxmemory_ = maxmemory_
+        self.eviction_ = eviction_
+        self.cycle_: int = 0
+        self.nevicted_: int = 0
+        self.prototypes: np.ndarray = np.empty((0, 0))
+        self.counter_: np.ndarray = np.empty(0, dtype=np.int64)
+        self.lasthit_: np.ndarray = np.empty(0, dtype=np.int64)
+        self.created_: np.ndarray = np.empty(0, dtype=np.int64)
+        self.winners_: Tuple[int, bool] = (-1, False)
+        self.history_: List[Dict[str, float]] = []
+        self.labels_: LabelBuffer = LabelBuffer(labelstorage_, labelpath_)
+        self.cachetol_ = cachetol_
+        self.nthreads_ = nthreads_
+        self.cache_: Optional[InputCache] = None
+        if cachesize_ > 0:
+            self.cache_ = InputCache(cachesize_, cachestep_)
+        self.__version: int = 0
+        self.__drift: np.ndarray = np.empty(0)
+        self.__norms: np.ndarray = np.empty((0, 2))
 
     def __repr__(self) -> str:
         v = self.vigilance_
@@ -51,67 +117,494 @@ class FuzzyART:
         return f"FuzzyART(vigilance ='{v}', alpha = '{a}', beta = '{b}')"
 
     def choice(self,
-               input: np.ndarray) -> List[float]:
+               input: np.ndarray) -> np.ndarray:
         """
         :param input: current input
         """
-        T: List[float] = []
-        for prototype in self.prototypes:
-            choice = np.sum(np.minimum(prototype, input))
-            choice /= self.alpha_ + np.sum(prototype)
-            T.append(choice)
-        return T
+        if issparse(input) or self.nthreads_ > 1:
+            return self.choicematch(input)[0]
+        return fuzzyand(self.prototypes, input) / \
+            (self.alpha_ + self.prototypes.sum(axis=1))
 
     def match(self,
-              input: np.ndarray) -> List[float]:
+              input: np.ndarray) -> np.ndarray:
         """
         :param input: current input
         """
+        if issparse(input) or self.nthreads_ > 1:
+            return self.choicematch(input)[1]
+        return self.__match(fuzzyand(self.prototypes, input), input)
 
-        M: List[float] = []
-        for prototype in self.prototypes:
-            if np.sum(prototype) == 0 and np.sum(input) == 0:
-                match = 1
-            else:
-                match = np.sum(np.minimum(prototype, input))/np.sum(input)
-            M.append(match)
-        return M
+    def choicematch(self,
+                    input: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        :param input: current input
+        returns the choice and the match of input from a single fuzzy AND,
+        of shape (B, K) for sparse inputs
+        """
+        if issparse(input):
+            if len(self.__norms) != len(self.prototypes):
+                self.__norms = halfnorms(self.prototypes)
+            intersection = blockfuzzyand(self.prototypes, input, self.nthreads_, self.__norms)
+            T = intersection/(self.alpha_ + self.__norms.sum(axis=1))
+            return (T, intersection/(self.prototypes.shape[1]//2))
+        if self.nthreads_ > 1:
+            (intersection, norms) = blockfuzzyand(self.prototypes, input,
+                                                  self.nthreads_, rownorms=True)
+            T = intersection/(self.alpha_ + norms)
+            return (T, self.__match(intersection, input))
+        intersection = fuzzyand(self.prototypes, input)
+        T = intersection/(self.alpha_ + self.prototypes.sum(axis=1))
+        return (T, self.__match(intersection, input))
 
-    def learn(self,
-              input: np.ndarray) -> None:
+    def __match(self,
+                intersection: np.ndarray,
+                input: np.ndarray) -> np.ndarray:
+        """
+        :param intersection: |min(input, w)|_1 of every prototype w
+        :param input: current input
+        """
+        norm = input.sum(axis=-1)
+        if np.ndim(norm) == 0:
+            if norm == 0:
+                return (self.prototypes.sum(axis=1) == 0).astype(float)
+            return intersection/norm
+        M = intersection/np.where(norm == 0, 1, norm)[:, None]
+        empty = (self.prototypes.sum(axis=1) == 0)[None, :]
+        return np.where((norm == 0)[:, None], empty.astype(float), M)
+
+    def __matchone(self,
+                   I: int,
+                   input: np.ndarray) -> float:
+        """
+        :param I: index of the category
+        :param input: current input
+        returns the match of input by category I alone
+        """
+        if issparse(input):
+            input = densecomplement(input)[0]
+        input = np.asarray(input).ravel()
+        norm = input.sum()
+        if norm == 0:
+            return float(self.prototypes[I].sum() == 0)
+        return float(np.minimum(self.prototypes[I], input).sum()/norm)
+
+    def capacity(self,
+                 nDim: int) -> float:
+        """
+        :param nDim: dimension of the (complement coded) inputs
+        returns the maximum number of categories allowed by
+        maxcategories_ and maxmemory_
+        """
+        capacity = np.inf
+        if self.maxcategories_ is not None:
+            capacity = self.maxcategories_
+        if self.maxmemory_ is not None:
+            nbytes = nDim*np.dtype(float).itemsize + 3*np.dtype(np.int64).itemsize
+            capacity = min(capacity, max(1, self.maxmemory_//nbytes))
+        return capacity
+
+    def __addcategory(self,
+                      input: np.ndarray) -> int:
+        """
+        :param input: the input committed as a new category
+        returns the index of the new category, which is that of an
+        evicted category when at capacity
+        """
+        if issparse(input):
+            input = densecomplement(input)[0]
+        input = np.asarray(input, dtype=float)
+        if len(self.prototypes) >= self.capacity(len(input)):
+            I = selectvictim(self.eviction_,
+                             self.counter_,
+                             self.lasthit_,
+                             self.created_)
+            self.prototypes[I] = input
+            self.counter_[I] = 1
+            self.lasthit_[I] = self.cycle_
+            self.created_[I] = self.cycle_
+            self.__version += 1
+            self.__drift[I] = 0.0
+            self.__norms[I] = halfnorms(input)
+            self.nevicted_ += 1
+            return I
+        if len(self.prototypes) == 0:
+            self.prototypes = input[None, :].copy()
+        else:
+            self.prototypes = np.concatenate((self.prototypes, input[None, :]))
+        self.counter_ = np.append(self.counter_, 1)
+        self.lasthit_ = np.append(self.lasthit_, self.cycle_)
+        self.created_ = np.append(self.created_, self.cycle_)
+        self.__version += 1
+        self.__drift = np.append(self.__drift, 0.0)
+        self.__norms = np.concatenate((self.__norms, halfnorms(input)[None, :]))
+        return len(self.prototypes) - 1
+
+    def __update(self,
+                 I: np.ndarray,
+                 input: np.ndarray) -> None:
+        """
+        :param I: index of the resonating category, or distinct indices
+        :param input: the input learnt by the category, one row per index
+        """
+        if issparse(input):
+            input = densecomplement(input)[0]
+        previous = self.prototypes[I].copy()
+        self.prototypes[I] = (1 - self.beta_)*previous \
+            + self.beta_*np.minimum(input, previous)
+        self.__norms[I] = halfnorms(self.prototypes[I])
+        if self.cache_ is not None:
+            self.__drift[I] += np.abs(self.prototypes[I] - previous).sum(axis=-1)
+            moved = self.__drift[I] > self.cachetol_
+            if np.any(moved):
+                self.__version += 1
+                self.__drift[I] = np.where(moved, 0.0, self.__drift[I])
+
+    def __resonate(self,
+                   input: np.ndarray,
+                   T: Optional[np.ndarray] = None,
+                   M: Optional[np.ndarray] = None) -> int:
         """
         :param input: the input vector to be fed the ART model
+        :param T: precomputed choice of input, see learn
+        :param M: precomputed match of input, see learn
+        returns the index of the resonating, possibly new, category
         """
+        key = None
+        if self.cache_ is not None and T is None:
+            key = self.cache_.key(input)
+            I = self.cache_.get(key, self.__version)
+            if I >= 0:
+                if self.__matchone(I, input) >= self.vigilance_:
+                    return self.__commit(I, input, key)
+                self.cache_.reject()
+
         if len(self.prototypes) == 0:
-            self.prototypes.append(input)
-            self.labels_.append(0)
+            self.winners_ = (self.__addcategory(input), True)
+        else:
+            if T is None or M is None:
+                (T, M) = self.choicematch(input)
+            T = np.where(M < self.vigilance_, -1.0, T).ravel()
+            I = selectwinner(T)
+            if T[I] >= 0:
+                return self.__commit(I, input, key)
+            self.winners_ = (self.__addcategory(input), True)
+        if key is not None:
+            self.cache_.put(key, self.winners_[0], self.__version)
+        return self.winners_[0]
+
+    def __commit(self,
+                 I: int,
+                 input: np.ndarray,
+                 key: Optional[bytes]) -> int:
+        """
+        :param I: index of the category resonating with input
+        :param input: the input vector learnt by the category
+        :param key: cache key of input, None when not cached
+        """
+        self.winners_ = (I, False)
+        self.__update(I, input)
+        self.counter_[I] += 1
+        self.lasthit_[I] = self.cycle_
+        if key is not None:
+            self.cache_.put(key, I, self.__version)
+        return I
+
+    def learn(self,
+              input: np.ndarray,
+              T: Optional[np.ndarray] = None,
+              M: Optional[np.ndarray] = None) -> None:
+        """
+        :param input: the input vector to be fed the ART model
+        :param T: choice of input as returned by choice, computed when
+                None, lets models with identical prototypes share it
+        :param M: match of input as returned by match, computed when None
+        """
+        self.cycle_ += 1
+        self.labels_.append(self.__resonate(input, T, M))
+
+    def learnbatch(self,
+                   inputs: np.ndarray) -> np.ndarray:
+        """
+        Approximate mini-batch learning. The choice and match of all the
+        inputs are evaluated at once against the prototypes as they were
+        at the start of the batch, each input resonating with the best
+        category passing the vigilance test. The categories are then
+        updated once with the fuzzy AND of all the inputs they won,
+        w = (1 - beta_)*w + beta_*min(w, x_1, ..., x_n), and the inputs no
+        category resonated with are learnt sequentially afterwards.
+
+        The labels diverge from those of learn when, within a batch,
+        an input would have resonated with a category created or moved
+        by an earlier input of the same batch, and when beta_ < 1 since
+        a category receives a single update per batch. A batch of one
+        input is identical to learn.
+
+        :param inputs: the input vectors, one per row
+        returns the labels of the inputs
+        """
+        if not issparse(inputs):
+            inputs = np.asarray(inputs)
+        labels = self.__learnbatch(inputs)
+        self.labels_.extend(labels)
+        return labels
+
+    def __learnbatch(self,
+                     inputs: np.ndarray) -> np.ndarray:
+        """
+        :param inputs: the input vectors, one per row
+        returns the labels of the inputs, see learnbatch
+        """
+        cycle = self.cycle_
+        nSamples = inputs.shape[0]
+        labels = np.full(nSamples, -1, dtype=np.int32)
+        if len(self.prototypes) > 0:
+            (T, M) = self.choicematch(inputs)
+            T[M < self.vigilance_] = -1.0
+            winners = selectwinner(T, axis=1)
+            resolved = T[np.arange(nSamples), winners] >= 0
+            labels[resolved] = winners[resolved]
+
+            winners = winners[resolved]
+            self.counter_ += np.bincount(winners, minlength=len(self.prototypes))
+            np.maximum.at(self.lasthit_, winners, cycle + 1 + np.flatnonzero(resolved))
+            if len(winners) > 0:
+                order = np.argsort(winners, kind="stable")
+                winners = winners[order]
+                starts = np.flatnonzero(np.r_[True, winners[1:] != winners[:-1]])
+                I = winners[starts]
+                learnt = inputs[resolved]
+                if issparse(learnt):
+                    learnt = densecomplement(learnt)
+                X = np.minimum.reduceat(learnt[order], starts, axis=0)
+                self.__update(I, X)
+
+        for itr in np.flatnonzero(labels < 0):
+            self.cycle_ = cycle + itr + 1
+            labels[itr] = self.__resonate(inputs[itr:itr + 1] if issparse(inputs) else inputs[itr])
+        self.cycle_ = cycle + nSamples
+        return labels
+
+    def predict(self,
+                inputs: np.ndarray) -> np.ndarray:
+        """
+        :param inputs: input(s) to be classified, one per row
+        returns the index of the category each input resonates with
+        without learning, -1 when no category passes the vigilance test
+        """
+        if issparse(inputs):
+            inputs = sparserows(inputs)
         else:
+            inputs = np.asarray(inputs)
+        if len(self.prototypes) == 0:
+            return np.full(inputs.shape[:-1], -1, dtype=np.int32)
+        (T, M) = self.choicematch(inputs)
+        T[M < self.vigilance_] = -1.0
+        I = selectwinner(T, axis=-1)
+        return np.where(np.max(T, axis=-1) < 0, -1, I).astype(np.int32)
+
+    def snapshot(self) -> "FuzzyART":
+        """
+        returns a read-only copy of the categories that keeps predicting
+        consistently while this model goes on learning, labels are not
+        copied
+        """
+        snapshot = copy.copy(self)
+        for name in ("prototypes", "counter_", "lasthit_", "created_"):
+            array = getattr(self, name).copy()
+            array.flags.writeable = False
+            setattr(snapshot, name, array)
+        snapshot.__norms = self.__norms.copy()
+        snapshot.labels_ = LabelBuffer("none")
+        return snapshot
 
-            T = self.choice(input)
-            M = self.match(input)
-            while not all(val < 0 for val in T):
-                I: int = T.index(max(T))
-                if M[I] >= self.vigilance_:
-                    self.prototypes[I] = (1 - self.beta_)*self.prototypes[I] \
-                            + self.beta_*np.minimum(input, self.prototypes[I])
-                    self.labels_.append(I)
-                    break
-                else:
-                    T[I] = -1.0
-
-            if all(val < 0 for val in T):
-                self.prototypes.append(input)
-                self.labels_.append(len(self.prototypes)-1)
+    def compact(self,
+                tol: float = 0.0,
+                inputs: Optional[np.ndarray] = None) -> Dict[str, float]:
+        """
+        :param tol: slack allowed on every side of a box for it to count
+                as containing another (see boxcontains)
+        :param inputs: complement coded samples whose predictions before
+                and after are compared, e.g. the training data
+        merges every category whose box lies inside that of another into
+        the largest such box, grown to the hull of both, and renumbers the
+        categories left in order. A merge is made only if the hull still
+        passes the vigilance test, |hull|_1 >= vigilance_*d, so that no
+        input inside it falls below vigilance. Counters add up, lasthit_
+        and created_ keep the latest hit and earliest creation, the stored
+        labels are rewritten. For tol = 0 the absorbing boxes are left as
+        they are, so only the inputs that chose a merged category can be
+        assigned differently.
+        returns the number of categories before and after, of stored
+        labels reassigned and of inputs predicted differently (see
+        compactionreport)
+        """
+        W = self.prototypes
+        nCategories = len(W)
+        if nCategories < 2:
+            return compactionreport(nCategories, nCategories, 0, None if inputs is None else 0)
+        minnorm = self.vigilance_*(W.shape[1]//2)
+        root = mergeroots(-W.sum(axis=1),
+                          lambda start, stop: boxcontains(W, start, stop, tol, minnorm),
+                          2*nCategories*W.shape[1]*W.itemsize)
+        sums = W.sum(axis=1)
+
+        def admitted(root: np.ndarray) -> np.ndarray:
+            hull = W.copy()
+            np.minimum.at(hull, root, W)
+            norms = hull.sum(axis=1)
+            return (norms >= minnorm) | (norms == sums)
+
+        root = admitmerges(root, admitted, -np.minimum(W, W[root]).sum(axis=1))
+        keep = root == np.arange(nCategories)
+        if keep.all():
+            return compactionreport(nCategories, nCategories, 0, None if inputs is None else 0)
+        predicted = None if inputs is None else self.predict(inputs)
+        hull = W.copy()
+        np.minimum.at(hull, root, W)
+        counter = np.bincount(root, weights=self.counter_, minlength=nCategories)
+        lasthit = self.lasthit_.copy()
+        np.maximum.at(lasthit, root, self.lasthit_)
+        created = self.created_.copy()
+        np.minimum.at(created, root, self.created_)
+        merged = np.flatnonzero(~keep)
+        reassigned = self.labels_.remap(merged, root[merged])
+        renumber = np.cumsum(keep) - 1
+        self.labels_.remap(np.arange(nCategories), renumber[root])
+        self.prototypes = hull[keep]
+        self.counter_ = counter[keep].astype(np.int64)
+        self.lasthit_ = lasthit[keep]
+        self.created_ = created[keep]
+        nKept = len(self.prototypes)
+        self.__version += 1
+        self.__drift = np.zeros(nKept)
+        self.__norms = halfnorms(self.prototypes)
+        if self.cache_ is not None:
+            self.cache_.clear()
+        changed = None
+        if inputs is not None:
+            expected = np.where(predicted >= 0, renumber[root][np.maximum(predicted, 0)], -1)
+            changed = int(np.count_nonzero(expected != self.predict(inputs)))
+        return compactionreport(nCategories, nKept, reassigned, changed)
+
+    def getlabels(self,
+                  start: int = 0,
+                  stop: Optional[int] = None) -> np.ndarray:
+        """
+        :param start: index of the first sample
+        :param stop: index one past the last sample, the end when None
+        """
+        return self.labels_.get(start, stop)
+
+    def __fitepochs(self,
+                    data: np.ndarray,
+                    verbose: bool,
+                    batchsize: int,
+                    maxepochs: int,
+                    tol: float,
+                    shuffle: bool,
+                    seed: Optional[int]) -> None:
+        """
+        present data for up to maxepochs epochs, see fit
+        """
+        sparse = issparse(data)
+        data = sparserows(data) if sparse else np.asarray(data)
+        nSamples = data.shape[0]
+        rng = orderrng(seed)
+        order = np.arange(nSamples)
+        labels = np.empty(nSamples, dtype=np.int32)
+        previous = np.full(nSamples, -1, dtype=np.int32)
+        if not sparse:
+            batch = np.empty((min(batchsize, nSamples),) + data.shape[1:], dtype=data.dtype)
+        before = self.prototypes.copy()
+        self.history_ = []
+        for epoch in range(maxepochs):
+            if shuffle:
+                rng.shuffle(order)
+            if before.shape == self.prototypes.shape:
+                np.copyto(before, self.prototypes)
+            else:
+                before = self.prototypes.copy()
+
+            if batchsize > 1:
+                for start in range(0, nSamples, batchsize):
+                    index = order[start:start + batchsize]
+                    if sparse:
+                        inputs = data[index]
+                    else:
+                        inputs = batch[:len(index)]
+                        np.take(data, index, axis=0, out=inputs)
+                    labels[index] = self.__learnbatch(inputs)
+            else:
+                for itr in order:
+                    self.cycle_ += 1
+                    labels[itr] = self.__resonate(data[itr:itr + 1] if sparse else data[itr])
+
+            reassigned = float(np.count_nonzero(labels != previous))/max(1, nSamples)
+            if before.shape != self.prototypes.shape:
+                change = np.inf
+            elif before.size == 0:
+                change = 0.0
+            else:
+                np.subtract(self.prototypes, before, out=before)
+                change = float(np.abs(before, out=before).max())
+            self.history_.append({"epoch": epoch + 1,
+                                  "reassigned": reassigned,
+                                  "weightchange": change,
+                                  "ncategories": len(self.prototypes)})
+            if verbose:
+                print(f"Epoch #{epoch + 1}: {len(self.prototypes)} categories, "
+                      f"{reassigned:.4f} reassigned, weight change {change:.3g}")
+            (labels, previous) = (previous, labels)
+            if reassigned == 0 and change <= tol:
+                break
+        self.labels_.extend(previous)
 
     def fit(self,
-            data: np.ndarray) -> None:
+            data: np.ndarray,
+            verbose: bool = False,
+            batchsize: int = 1,
+            maxepochs: int = 1,
+            tol: float = 1e-4,
+            shuffle: bool = False,
+            seed: Optional[int] = None) -> None:
         """
         :param data: the input data for the ART model
+        :param verbose: to print verbose
+        :param batchsize: number of observations learnt at once, values
+                above 1 trade fidelity to the sequential algorithm for
+                throughput (see learnbatch)
+        :param maxepochs: maximum number of presentations of data. With
+                more than one epoch, or shuffle, training stops after
+                the first epoch in which no category was created, no
+                observation changed category and no weight moved by
+                more than tol. history_ records every epoch, and labels_
+                receives the labels of the last epoch, in data order.
+        :param tol: largest weight change still considered converged.
+                With beta_ < 1 the weights only approach their limit, so
+                tol must be positive for training to stop early
+        :param shuffle: to present the observations in a new random order
+                every epoch
+        :param seed: seed of the shuffling, that of setseed when None
         """
-        temp = 0
-        for val in data:
-            temp += 1
-            print(f"Presenting observation #{temp}")
-            self.learn(val)
-        print("Done learning")
-
+        if maxepochs > 1 or shuffle:
+            self.__fitepochs(data, verbose, batchsize, maxepochs, tol, shuffle, seed)
+        elif batchsize > 1:
+            data = sparserows(data) if issparse(data) else np.asarray(data)
+            for start in range(0, data.shape[0], batchsize):
+                if verbose:
+                    stop = min(data.shape[0], start + batchsize)
+                    print(f"Presenting observations #{start + 1}-#{stop}")
+                self.learnbatch(data[start:start + batchsize])
+        else:
+            if issparse(data):
+                rows = sparserows(data)
+                data = (rows[itr:itr + 1] for itr in range(rows.shape[0]))
+            temp = 0
+            for val in data:
+                temp += 1
+                if verbose:
+                    print(f"Presenting observation #{temp}")
+                self.learn(val)
+        if verbose:
+            print("Done learning")
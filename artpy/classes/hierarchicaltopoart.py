@@ -0,0 +1,199 @@
+"""
+    ARTPY: A Python library of Adaptive Resonance Theory based learning
+     models.
+
+    This file provides HierarchicalTopoART class.
+"""
+
+from typing import Optional, Tuple
+import numpy as np
+from ..functions import *
+from .labelbuffer import LabelBuffer
+from .topoart import TopoART
+
+__author__ = "Raghu Yelugam"
+__copyright__ = "Copyright 2023"
+__credits__ = ["Leonardo Enzo Brito Da Silva", "Donald Wunsch"]
+__license__ = "GPL"
+__version__ = "0.0.1"
+__maintainer__ = "Raghu Yelugam"
+__email__ = "ry222@mst.edu"
+__status__ = "Release"
+__date__ = "2023.04.13"
+
+
+class HierarchicalTopoART:
+    """
+    Reference: Tscherepanow, M., 2010. TopoART: A topology learning hierarc
+    -hical ART network. In Artificial Neural Networks–ICANN 2010: 20th Inte
+    -rnational Conference, Thessaloniki, Greece, September 15-18, 2010,
+    Proceedings, Part III 20 (pp. 157-167). Springer Berlin Heidelberg.
+
+    The two modules of TopoART trained in a single pass: module A learns
+    every input and module B, with a higher vigilance, only the inputs
+    learnt by a permanent prototype of A, so that B refines the clusters
+    of A without the noise A filters out. The filtering reads the
+    winner A reports after learning, so B's choice and match are only
+    computed for the inputs it receives.
+    """
+
+    def __init__(self,
+                 vigilance_: float,
+                 alpha_: float,
+                 beta1_: float,
+                 beta2_: float,
+                 phi_: int,
+                 tau_: int,
+                 vigilanceb_: Optional[float] = None,
+                 labelstorage_: str = "memory",
+                 labelpath_: Optional[str] = None,
+                 nthreads_: int = 1) -> None:
+        """
+        :param vigilance_: vigilance value of module A
+        :param alpha_: The parameter for the choice function evaluation
+        :param beta1_: Learning rate for training the first winner
+        :param beta2_: Learning rate for training the second winner
+        :param phi_: The minimum number of samples to be summarised to
+                be a permanent prototype
+        :param tau_: The number of time steps for pruning temporary prototypes
+        :param vigilanceb_: vigilance value of module B, (1 + vigilance_)/2
+                when None as in the reference
+        :param labelstorage_: where the per-sample labels are kept (see
+                TopoART)
+        :param labelpath_: file backing the labels when labelstorage_ is
+                "memmap", the modules use labelpath_ + ".a" and ".b"
+        :param nthreads_: see TopoART
+        """
+        if vigilanceb_ is None:
+            vigilanceb_ = (1 + vigilance_)/2
+        self.vigilance_: float = vigilance_
+        self.vigilanceb_: float = vigilanceb_
+        self.phi_: int = phi_
+        self.moduleA_: TopoART = TopoART(vigilance_, alpha_, beta1_, beta2_, phi_, tau_,
+                                         labelstorage_,
+                                         None if labelpath_ is None else labelpath_ + ".a",
+                                         nthreads_)
+        self.moduleB_: TopoART = TopoART(vigilanceb_, alpha_, beta1_, beta2_, phi_, tau_,
+                                         labelstorage_,
+                                         None if labelpath_ is None else labelpath_ + ".b",
+                                         nthreads_)
+        routedpath = None if labelpath_ is None else labelpath_ + ".routed"
+        self.__routed: LabelBuffer = LabelBuffer(labelstorage_, routedpath)
+        self.nsamples_: int = 0
+        self.nroutedsamples_: int = 0
+
+    def __repr__(self) -> str:
+        va = self.vigilance_
+        vb = self.vigilanceb_
+        return f"HierarchicalTopoART(vigilance = {va}, vigilanceb = {vb})"
+
+    def learn(self,
+              input: np.ndarray) -> bool:
+        """
+        :param input: the complement coded input vector
+        returns whether the input was passed on to module B
+        """
+        A = self.moduleA_
+        # pruning at the end of learn replaces the counter array, the one
+        # held here keeps the count of the first winner right after learning
+        counter = A.prototypes_["counter"]
+        A.learn(input)
+        (IFW, _, created) = A.winners_
+        routed = not created and counter[IFW] >= self.phi_
+        if routed:
+            self.moduleB_.learn(input)
+            self.nroutedsamples_ += 1
+        self.__routed.append(int(routed))
+        self.nsamples_ += 1
+        return routed
+
+    def fit(self,
+            data: np.ndarray,
+            verbose: bool = False) -> None:
+        """
+        :param data: the input data, complement coded here as in
+                TopoART.fit
+        :param verbose: to print verbose
+        """
+        data = complementcoding(data)
+        if issparse(data):
+            rows = data
+            data = (rows[itr:itr + 1] for itr in range(rows.shape[0]))
+        temp = 0
+        for val in data:
+            temp += 1
+            if verbose:
+                print(f"Presenting observation #{temp}")
+            self.learn(val)
+        for module in (self.moduleA_, self.moduleB_):
+            module.prune()
+            module.linkedges()
+            module.label()
+        if verbose:
+            print("Done learning")
+
+    def getlabels(self,
+                  module: str = "a",
+                  start: int = 0,
+                  stop: Optional[int] = None) -> np.ndarray:
+        """
+        :param module: "a" for the coarse clusters, "b" for the fine ones
+        :param start: index of the first sample
+        :param stop: index one past the last sample, the end when None
+        returns the topological cluster of every sample in the module,
+        -1 for the samples module B did not receive
+        """
+        if module == "a":
+            return self.moduleA_.getlabels(start, stop)
+        if module != "b":
+            raise ValueError(f"expected module in ('a', 'b'), got {module}")
+        routed = self.__routed.get(0, stop).astype(bool)
+        first = int(np.count_nonzero(routed[:start]))
+        routed = routed[start:]
+        labels = np.full(len(routed), -1, dtype=np.int32)
+        labels[routed] = self.moduleB_.getlabels(first, first + int(np.count_nonzero(routed)))
+        return labels
+
+    def getrouted(self,
+                  start: int = 0,
+                  stop: Optional[int] = None) -> np.ndarray:
+        """
+        :param start: index of the first sample
+        :param stop: index one past the last sample, the end when None
+        returns 1 for the samples passed on to module B, 0 otherwise
+        """
+        return self.__routed.get(start, stop)
+
+    def predict(self,
+                inputs: np.ndarray) -> np.ndarray:
+        """
+        :param inputs: complement coded input(s), one per row
+        returns the clusters predicted by module A and module B, stacked
+        along the first axis
+        """
+        return np.stack([self.moduleA_.predict(inputs),
+                         self.moduleB_.predict(inputs)])
+
+    def classify(self,
+                 input: np.ndarray) -> np.ndarray:
+        """
+        :param input: Input data to be classified
+        """
+        coded = complementcoding(input)
+        return self.predict(coded if issparse(coded) else np.asarray(coded))
+
+    def compact(self,
+                tol: float = 0.0,
+                inputs: Optional[np.ndarray] = None) -> Tuple[dict, dict]:
+        """
+        :param tol: see TopoART.compact
+        :param inputs: see TopoART.compact
+        returns the compaction reports of module A and of module B
+        """
+        return (self.moduleA_.compact(tol, inputs), self.moduleB_.compact(tol, inputs))
+
+    def topologies(self) -> Tuple[list, list]:
+        """
+        returns the edges of module A and of module B
+        """
+        return (self.moduleA_.edges_, self.moduleB_.edges_)
@@ -7,8 +7,10 @@
 
 import os
 import numpy as np
-from typing import Dict, List, Tuple, Union
+from typing import Dict, List, Optional, Tuple, Union
 from ..functions import *
+from .labelbuffer import LabelBuffer
+from .inputcache import InputCache
 
 __author__ = "Raghu Yelugam"
 __copyright__ = "Copyright 2023"
@@ -35,28 +37,97 @@ class HypersphereART:
                  vigilance_: float,
                  alpha_: float,
                  beta_: float,
-                 radialextend_: float,
-                 rmax_: float) -> None:
+                 radialextend_: Optional[float],
+                 rmax_: Optional[float],
+                 labelstorage_: str = "memory",
+                 labelpath_: Optional[str] = None,
+                 maxcategories_: Optional[int] = None,
+                 maxmemory_: Optional[int] = None,
+                 eviction_: str = "lru",
+                 cachesize_: int = 0,
+                 cachestep_: float = 0.0,
+                 cachetol_: float = 0.0,
+                 nthreads_: int = 1) -> None:
         """
         :param vigilance_: vigilance value for training the ART model
         :param alpha_: The parameter for the choice function evaluation
         :param beta_: Learning rate for training the ART model
         :param radialextend_: The radial extension parameter, should be a value
-            between [rmax_, inf)
-        :param rmax_: The maximum radius of the presented data
+            between [rmax_, inf), rmax_ when None
+        :param rmax_: The maximum radius of the presented data. When None
+            the model learns online: rmax_ is estimated from the inputs
+            seen as half the diagonal of their bounding box, an upper
+            bound of computermax, and radialextend_ (0 when None) grows
+            to it whenever the estimate exceeds it
+        :param labelstorage_: where the per-sample labels are kept, one of
+                "memory", "memmap" or "none" (see LabelBuffer)
+        :param labelpath_: file backing the labels when labelstorage_ is
+                "memmap"
+        :param maxcategories_: maximum number of categories, unbounded
+                when None
+        :param maxmemory_: maximum number of bytes held by the categories
+                and their statistics, unbounded when None
+        :param eviction_: category replaced by a new one once a limit is
+                reached, one of "lru", "count" or "oldest" (see
+                selectvictim). The evicted category's index is reused,
+                so earlier labels with that index refer to the old one.
+        :param cachesize_: number of recent inputs whose resonating
+                category is cached (see InputCache), so that learning a
+                repeated input skips the choice and match of all the
+                categories. The cached categories are dropped as soon
+                as any category is created, evicted or has moved by
+                more than cachetol_, so that a hit returns the winner
+                of the full search up to cachetol_. A cached category
+                failing vigilance counts as a miss and the full search
+                runs, no cache when 0
+        :param cachestep_: quantisation step of the cache keys, exact
+                duplicates only when 0
+        :param cachetol_: total change of the center (L1) and radius a
+                category may accumulate before the cache entries are
+                invalidated
+        :param nthreads_: number of threads evaluating the distances to
+                blocks of categories in parallel (see blockdistance),
+                worthwhile for very many categories
         radialextendu_ refers to uncommitted nodes radialextend
         """
         self.vigilance_ = vigilance_
         self.alpha_ = alpha_
         self.beta_ = beta_
-        self.prototypes_: List[List[np.ndarray, float]] = []
-        self.labels_: List[int] = []
+        self.prototypes_: Dict[str, np.ndarray] = {"centers": np.empty((0, 0)),
+                                                   "radii": np.empty(0)}
+        self.labels_: LabelBuffer = LabelBuffer(labelstorage_, labelpath_)
+        self.online_: bool = rmax_ is None
+        if self.online_:
+            rmax_ = 0.0
+            radialextend_ = max(radialextend_ or 0.0, np.finfo(float).eps)
+        elif radialextend_ is None:
+            radialextend_ = rmax_
         if radialextend_ < rmax_:
             error = f"expected radialextend_ ({radialextend_}) >= rmax_ ({rmax_})"
             raise Exception(error)
+        if eviction_ not in EVICTIONPOLICIES:
+            error = f"expected eviction_ in {EVICTIONPOLICIES}, got {eviction_}"
+            raise ValueError(error)
+        self.maxcategories_ = maxcategories_
+        self.maxmemory_ = maxmemory_
+        self.eviction_ = eviction_
+        self.cycle_: int = 0
+        self.nevicted_: int = 0
+        self.counter_: np.ndarray = np.empty(0, dtype=np.int64)
+        self.lasthit_: np.ndarray = np.empty(0, dtype=np.int64)
+        self.created_: np.ndarray = np.empty(0, dtype=np.int64)
         self.radialextend_ = radialextend_
         self.rmax_ = rmax_
         self.radialextendu_ = 2*self.radialextend_
+        self.lower_: Optional[np.ndarray] = None
+        self.upper_: Optional[np.ndarray] = None
+        self.cachetol_ = cachetol_
+        self.nthreads_ = nthreads_
+        self.cache_: Optional[InputCache] = None
+        if cachesize_ > 0:
+            self.cache_ = InputCache(cachesize_, cachestep_)
+        self.__version: int = 0
+        self.__drift: np.ndarray = np.empty(0)
 
     def __repr__(self) -> str:
         v = self.vigilance_
@@ -67,59 +138,271 @@ class HypersphereART:
         return f"HypershpereART(vigilance = {v}, alpha = {a}, beta = {b}, radialextend = {re}, rmax = {rm})"
 
     def choice(self,
-               input: np.ndarray) -> List[float]:
+               input: np.ndarray) -> np.ndarray:
         """
         :param input: current input
+        returns the choice of every category followed by that of the
+        uncommitted category
         """
-        T: List[float] = []
-        for prototype in self.prototypes_:
-            choice = self.radialextend_ - max(prototype[1],
-                                              euclideandistance(prototype[0], input))
-            choice /= self.radialextend_ - prototype[1] + self.alpha_
-            T.append(choice)
-        T.append(self.radialextend_/(self.radialextendu_ + self.alpha_))
-        return T
+        T = self.choicematch(input)[0]
+        return np.append(T, self.radialextend_/(self.radialextendu_ + self.alpha_))
 
     def match(self,
               input: np.ndarray,
-              index: int) -> float:
+              index: Optional[int] = None) -> Union[float, np.ndarray]:
         """
         :param input: current input
+        :param index: the category, all of them when None
         """
-        M = max(self.prototypes_[index][1],
-            euclideandistance(self.prototypes_[index][0], input))
+        if index is None:
+            return self.choicematch(input)[1]
+        M = max(self.prototypes_["radii"][index],
+                euclideandistance(self.prototypes_["centers"][index], input))
         return 1 - (M/self.radialextend_)
 
+    def choicematch(self,
+                    input: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        :param input: current input
+        returns the choice and the match of input by every category from
+        a single pass over the centers
+        """
+        radii = self.prototypes_["radii"]
+        extent = np.maximum(radii, blockdistance(self.prototypes_["centers"],
+                                                 input,
+                                                 self.nthreads_))
+        T = (self.radialextend_ - extent)/(self.radialextend_ - radii + self.alpha_)
+        return (T, 1 - (extent/self.radialextend_))
+
+    def capacity(self,
+                 nDim: int) -> float:
+        """
+        :param nDim: dimension of the inputs
+        returns the maximum number of categories allowed by
+        maxcategories_ and maxmemory_
+        """
+        capacity = np.inf
+        if self.maxcategories_ is not None:
+            capacity = self.maxcategories_
+        if self.maxmemory_ is not None:
+            nbytes = (nDim + 1)*np.dtype(float).itemsize + 3*np.dtype(np.int64).itemsize
+            capacity = min(capacity, max(1, self.maxmemory_//nbytes))
+        return capacity
+
+    def __addcategory(self,
+                      input: np.ndarray) -> int:
+        """
+        :param input: the input committed as a new category
+        returns the index of the new category, which is that of an
+        evicted category when at capacity
+        """
+        input = np.array(input, dtype=float)
+        if len(self.prototypes_["radii"]) >= self.capacity(len(input)):
+            I = selectvictim(self.eviction_,
+                             self.counter_,
+                             self.lasthit_,
+                             self.created_)
+            self.prototypes_["centers"][I] = input
+            self.prototypes_["radii"][I] = 0.0
+            self.counter_[I] = 1
+            self.lasthit_[I] = self.cycle_
+            self.created_[I] = self.cycle_
+            self.__version += 1
+            self.__drift[I] = 0.0
+            self.nevicted_ += 1
+            return I
+        if len(self.prototypes_["radii"]) == 0:
+            self.prototypes_["centers"] = input[None, :]
+        else:
+            self.prototypes_["centers"] = np.concatenate((self.prototypes_["centers"],
+                                                          input[None, :]))
+        self.prototypes_["radii"] = np.append(self.prototypes_["radii"], 0.0)
+        self.counter_ = np.append(self.counter_, 1)
+        self.lasthit_ = np.append(self.lasthit_, self.cycle_)
+        self.created_ = np.append(self.created_, self.cycle_)
+        self.__version += 1
+        self.__drift = np.append(self.__drift, 0.0)
+        return len(self.prototypes_["radii"]) - 1
+
+    def __update(self,
+                 I: int,
+                 input: np.ndarray) -> None:
+        """
+        :param I: index of the category resonating with input
+        :param input: the input vector learnt by the category
+        """
+        (centers, radii) = (self.prototypes_["centers"], self.prototypes_["radii"])
+        dist = euclideandistance(input, centers[I])
+        a: float = 1 - min(radii[I], dist)/dist if dist > 0 else 0.0
+        b: float = input - centers[I]
+        shift = self.beta_*a*b/2
+        centers[I] += shift
+        a = max(radii[I], dist)
+        b = radii[I]
+        radii[I] += self.beta_*(a - b)/2
+        self.counter_[I] += 1
+        self.lasthit_[I] = self.cycle_
+        if self.cache_ is not None:
+            self.__drift[I] += np.abs(shift).sum() + self.beta_*(a - b)/2
+            if self.__drift[I] > self.cachetol_:
+                self.__version += 1
+                self.__drift[I] = 0.0
+
+    def __observe(self,
+                  input: np.ndarray) -> None:
+        """
+        :param input: the current input
+        widens the bounding box of the inputs seen and grows rmax_ and
+        radialextend_ with it. The centers and radii are kept in input
+        units, so they stay valid as radialextend_ grows and only the
+        uncommitted category's radialextendu_ is rescaled along
+        """
+        if self.lower_ is None:
+            self.lower_ = np.array(input, dtype=float)
+            self.upper_ = np.array(input, dtype=float)
+            return
+        np.minimum(self.lower_, input, out=self.lower_)
+        np.maximum(self.upper_, input, out=self.upper_)
+        rmax = euclideandistance(self.upper_, self.lower_)/2
+        if rmax <= self.rmax_:
+            return
+        self.rmax_ = rmax
+        if rmax > self.radialextend_:
+            self.radialextend_ = rmax
+            self.radialextendu_ = 2*self.radialextend_
+        if self.cache_ is not None:
+            self.cache_.clear()
+
     def learn(self,
               input: np.ndarray) -> None:
         """
         :param input: the input vector to be fed the ART model
         """
-        if len(self.prototypes_) == 0:
-            self.prototypes_.append([input, 0])
-            self.labels_.append(0)
+        self.cycle_ += 1
+        if self.online_:
+            self.__observe(input)
+        key = None
+        if self.cache_ is not None:
+            key = self.cache_.key(input)
+            I = self.cache_.get(key, self.__version)
+            if I >= 0 and self.match(input, I) >= self.vigilance_:
+                self.__update(I, input)
+                self.labels_.append(I)
+                self.cache_.put(key, I, self.__version)
+                return
+            if I >= 0:
+                self.cache_.reject()
+
+        if len(self.prototypes_["radii"]) == 0:
+            I = self.__addcategory(input)
         else:
-            T = self.choice(input)
-            while not all(val < 0 for val in T):
-                I: int = T.index(max(T))
-                if I == len(self.prototypes_):
-                    self.prototypes_.append([input, 0])
-                    self.labels_.append(len(self.prototypes_) - 1)
-                    break
-                else:
-                    M: float = self.match(input, I)
-                    if M >= self.vigilance_:
-                        dist = euclideandistance(input, self.prototypes_[I][0])
-                        a: float = 1 - min(self.prototypes_[I][1], dist)/dist
-                        b: float = input - self.prototypes_[I][0]
-                        self.prototypes_[I][0] += self.beta_*a*b/2
-                        a = max(self.prototypes_[I][1], dist)
-                        b = self.prototypes_[I][1]
-                        self.prototypes_[I][1] += self.beta_*(a - b)/2
-                        self.labels_.append(I)
-                        break
-                    else:
-                        T[I] = -1.0
+            (T, M) = self.choicematch(input)
+            T = np.append(np.where(M < self.vigilance_, -1.0, T),
+                          self.radialextend_/(self.radialextendu_ + self.alpha_))
+            I = selectwinner(T)
+            if I == len(self.prototypes_["radii"]):
+                I = self.__addcategory(input)
+            else:
+                self.__update(I, input)
+        self.labels_.append(I)
+        if key is not None:
+            self.cache_.put(key, I, self.__version)
+
+    def __assign(self,
+                 inputs: np.ndarray) -> np.ndarray:
+        """
+        :param inputs: samples, one per row
+        returns the category each sample resonates with without learning
+        it, -1 when it would create a new category
+        """
+        inputs = np.asarray(inputs, dtype=float)
+        nCategories = len(self.prototypes_["radii"])
+        if nCategories == 0:
+            return np.full(inputs.shape[:-1], -1, dtype=np.int64)
+        (T, M) = self.choicematch(inputs)
+        uncommitted = self.radialextend_/(self.radialextendu_ + self.alpha_)
+        T = np.concatenate((np.where(M < self.vigilance_, -1.0, T),
+                            np.full(T.shape[:-1] + (1,), uncommitted)), axis=-1)
+        I = selectwinner(T, axis=-1)
+        return np.where(I == nCategories, -1, I)
+
+    def compact(self,
+                tol: float = 0.0,
+                inputs: Optional[np.ndarray] = None) -> Dict[str, float]:
+        """
+        :param tol: slack allowed on the radii for a sphere to count as
+                containing another (see spherecontains)
+        :param inputs: samples whose assigned categories before and after
+                are compared, e.g. the training data
+        merges every category whose sphere lies inside that of another
+        into the largest such sphere, grown to enclose both, and renumbers
+        the categories left in order. A merge is made only if the grown
+        sphere still passes the vigilance test, a radius of at most
+        (1 - vigilance_)*radialextend_. Counters add up, lasthit_ and
+        created_ keep the latest hit and earliest creation, the stored
+        labels are rewritten.
+        returns the number of categories before and after, of stored
+        labels reassigned and of inputs assigned differently (see
+        compactionreport)
+        """
+        centers = self.prototypes_["centers"]
+        radii = self.prototypes_["radii"]
+        nCategories = len(radii)
+        unchanged = compactionreport(nCategories, nCategories, 0, None if inputs is None else 0)
+        if nCategories < 2:
+            return unchanged
+        maxradius = (1 - self.vigilance_)*self.radialextend_
+        root = mergeroots(radii,
+                          lambda start, stop: spherecontains(centers, radii, start, stop, tol,
+                                                             maxradius),
+                          3*nCategories*radii.itemsize)
+        cost = radii + np.sqrt(np.sum((centers - centers[root])**2, axis=1))
+
+        def admitted(root: np.ndarray) -> np.ndarray:
+            extent = radii.copy()
+            np.maximum.at(extent, root, radii + np.sqrt(np.sum((centers - centers[root])**2, axis=1)))
+            return (extent <= maxradius) | (extent == radii)
+
+        root = admitmerges(root, admitted, cost)
+        keep = root == np.arange(nCategories)
+        if keep.all():
+            return unchanged
+        assigned = None if inputs is None else self.__assign(inputs)
+        extent = radii.copy()
+        np.maximum.at(extent, root, radii + np.sqrt(np.sum((centers - centers[root])**2, axis=1)))
+        counter = np.bincount(root, weights=self.counter_, minlength=nCategories)
+        lasthit = self.lasthit_.copy()
+        np.maximum.at(lasthit, root, self.lasthit_)
+        created = self.created_.copy()
+        np.minimum.at(created, root, self.created_)
+        merged = np.flatnonzero(~keep)
+        reassigned = self.labels_.remap(merged, root[merged])
+        renumber = np.cumsum(keep) - 1
+        self.labels_.remap(np.arange(nCategories), renumber[root])
+        self.prototypes_["centers"] = centers[keep]
+        self.prototypes_["radii"] = extent[keep]
+        self.counter_ = counter[keep].astype(np.int64)
+        self.lasthit_ = lasthit[keep]
+        self.created_ = created[keep]
+        nKept = len(self.counter_)
+        self.__version += 1
+        self.__drift = np.zeros(nKept)
+        if self.cache_ is not None:
+            self.cache_.clear()
+        changed = None
+        if inputs is not None:
+            expected = np.where(assigned >= 0, renumber[root][np.maximum(assigned, 0)], -1)
+            changed = int(np.count_nonzero(expected != self.__assign(inputs)))
+        return compactionreport(nCategories, nKept, reassigned, changed)
+
+    def getlabels(self,
+                  start: int = 0,
+                  stop: Optional[int] = None) -> np.ndarray:
+        """
+        :param start: index of the first sample
+        :param stop: index one past the last sample, the end when None
+        """
+        return self.labels_.get(start, stop)
 
     def fit(self,
             data: np.ndarray,
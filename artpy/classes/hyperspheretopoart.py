@@ -6,13 +6,13 @@
 """
 
 import os
-from typing import Dict, List, Tuple, IO
+from typing import Dict, List, Optional, Tuple, IO, Union
 #from operator import itemgetter
 import numpy as np
 import networkx as nx
 from pyvis.network import Network
 from .. functions import *
-import ipdb
+from .labelbuffer import LabelBuffer
 
 __author__ = "Raghu Yelugam"
 __copyright__ = "Copyright 2023"
@@ -38,23 +38,43 @@ class HypersphereTopoART:
                  alpha_: float,
                  beta1_: float,
                  beta2_: float,
-                 radialextend_: float,
-                 rmax_: float,
+                 radialextend_: Optional[float],
+                 rmax_: Optional[float],
                  phi_: int,
-                 tau_: int) -> None:
+                 tau_: int,
+                 labelstorage_: str = "memory",
+                 labelpath_: Optional[str] = None,
+                 nthreads_: int = 1) -> None:
         """
         :param vigilance_: vigilance value for training the ART model
         :param alpha_: The parameter for the choice function evaluation
         :param beta1_: Learning rate for training the first winner
         :param beta2_: Learning rate for training the second winner
         :param radialextend_: The radial extension parameter, should be a value
-            between [rmax_, inf)
-        :param rmax_: The maximum radius of the presented data
+            between [rmax_, inf), rmax_ when None
+        :param rmax_: The maximum radius of the presented data. When None
+            the model learns online: rmax_ is estimated from the inputs
+            seen as half the diagonal of their bounding box, an upper
+            bound of computermax, and radialextend_ (0 when None) grows
+            to it whenever the estimate exceeds it
         :param phi_: The minimum number of samples to be summarised to
                 be a permanent prototype
         :param tau_: The number of time steps for pruning temporary prototypes
+        :param labelstorage_: where the per-sample labels are kept, one of
+                "memory", "memmap" or "none" (see LabelBuffer)
+        :param labelpath_: file backing the labels when labelstorage_ is
+                "memmap", the topological labels use labelpath_ + ".topo"
+        :param nthreads_: number of threads evaluating the distances to
+                blocks of prototypes in parallel (see blockdistance),
+                worthwhile for very many prototypes
         radialextendu_ refers to uncommitted nodes radialextend
         """
+        self.online_: bool = rmax_ is None
+        if self.online_:
+            rmax_ = 0.0
+            radialextend_ = max(radialextend_ or 0.0, np.finfo(float).eps)
+        elif radialextend_ is None:
+            radialextend_ = rmax_
         if radialextend_ < rmax_:
             error = f"expected radialextend_ ({radialextend_}) >= rmax_ ({rmax_})"
             raise Exception(error)
@@ -66,76 +86,156 @@ class HypersphereTopoART:
         self.phi_: float = phi_
         self.cycle_: int = 0
         self.tau_: int = tau_
-        self.prototypes_: Dict[List[List[np.ndarray, float]], List[int], List[str]] = {}
-        self.prototypes_["weights"] = []
-        self.prototypes_["counter"] = []
-        self.prototypes_["tag"] = []
-        self.__labels_: List[str] = []
+        self.nthreads_: int = nthreads_
+        self.prototypes_: Dict[str, Union[np.ndarray, List[str]]] = {"centers": np.empty((0, 0)),
+                                                                     "radii": np.empty(0),
+                                                                     "counter": np.empty(0, dtype=np.int64),
+                                                                     "tag": []}
+        self.__labels_: LabelBuffer = LabelBuffer(labelstorage_, labelpath_)
         self.edges_: List[Tuple[str, str]] = []
         self.topoClusters_: List[List[str]] = []
-        self.labels_: List[int] = []
+        topopath = None if labelpath_ is None else labelpath_ + ".topo"
+        self.__topolabels: LabelBuffer = LabelBuffer(labelstorage_, topopath)
+        self.__stale: bool = False
         self.__addedTags: List[str] = []
         self.radialextend_ = radialextend_
         self.rmax_ = rmax_
         self.radialextendu_ = 2*self.radialextend_
+        self.lower_: Optional[np.ndarray] = None
+        self.upper_: Optional[np.ndarray] = None
 
     def __repr__(self) -> str:
-        #Change this
         v = self.vigilance_
         a = self.alpha_
-        b = self.beta_
+        b1 = self.beta1_
+        b2 = self.beta2_
         re = self.radialextend_
         rm = self.rmax_
-        return f"HypersphereTopoART(vigilance = {v}, alpha = {a}, beta = {b}, radialextend = {re}, rmax = {rm})"
+        return f"HypersphereTopoART(vigilance = {v}, alpha = {a}, beta1 = {b1}, beta2 = {b2}, radialextend = {re}, rmax = {rm})"
 
     def choice(self,
-               input: np.ndarray) -> List[float]:
+               input: np.ndarray) -> np.ndarray:
         """
         :param input: current input
+        returns the choice of every prototype followed by that of the
+        uncommitted prototype
         """
-        T: List[float] = []
-        for prototype in self.prototypes_["weights"]:
-            choice = self.radialextend_ - max(prototype[1],
-                                              euclideandistance(prototype[0], input))
-            choice /= self.radialextend_ - prototype[1] + self.alpha_
-            T.append(choice)
-        T.append(self.radialextend_/(self.radialextendu_ + self.alpha_))
-        return T
+        T = self.choicematch(input)[0]
+        return np.append(T, self.radialextend_/(self.radialextendu_ + self.alpha_))
 
     def match(self,
               input: np.ndarray,
-              index: int) -> float:
+              index: Optional[int] = None) -> Union[float, np.ndarray]:
         """
         :param input: current input
+        :param index: the prototype, all of them when None
         """
-        M = max(self.prototypes_["weights"][index][1],
-            euclideandistance(self.prototypes_["weights"][index][0], input))
+        if index is None:
+            return self.choicematch(input)[1]
+        M = max(self.prototypes_["radii"][index],
+                euclideandistance(self.prototypes_["centers"][index], input))
         return 1 - (M/self.radialextend_)
 
+    def choicematch(self,
+                    input: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        :param input: current input(s)
+        returns the choice and the match of input by every prototype from
+        a single pass over the centers
+        """
+        radii = self.prototypes_["radii"]
+        extent = np.maximum(radii, blockdistance(self.prototypes_["centers"],
+                                                 input,
+                                                 self.nthreads_))
+        T = (self.radialextend_ - extent)/(self.radialextend_ - radii + self.alpha_)
+        return (T, 1 - (extent/self.radialextend_))
+
     def prune(self) -> None:
         """
         prune the prototypes with count less than self.tau_
-        replace label for samples summarised by pruned prototypes
-        with "d"
-        """
-        counts = np.array(self.prototypes_["counter"])
-        pruneLocations = np.where(counts<self.phi_)[0]
-        pruneLocations[::-1].sort()
-        tags = []
-        for index in pruneLocations:
-            del self.prototypes_["weights"][index]
-            del self.prototypes_["counter"][index]
-            tags.append(self.prototypes_["tag"].pop(index))
-        itr = 0
-        while itr < len(self.edges_):
-            if self.edges_[itr][0] in tags \
-             or self.edges_[itr][1] in tags:
-                self.edges_.remove(self.edges_[itr])
-                itr -= 1
-            itr += 1
-        for (loc, x) in enumerate(self.__labels_):
-            if x in tags:
-                self.__labels_[loc] = "d"
+        samples summarised by pruned prototypes are labelled -1 when the
+        labels are read, tags are never reused so the stored labels need
+        not be rewritten
+        """
+        keep = self.prototypes_["counter"] >= self.phi_
+        tags = {tag for (tag, k) in zip(self.prototypes_["tag"], keep) if not k}
+        self.prototypes_["centers"] = self.prototypes_["centers"][keep]
+        self.prototypes_["radii"] = self.prototypes_["radii"][keep]
+        self.prototypes_["counter"] = self.prototypes_["counter"][keep]
+        self.prototypes_["tag"] = [tag for (tag, k) in zip(self.prototypes_["tag"], keep) if k]
+        self.edges_ = [edge for edge in self.edges_
+                       if edge[0] not in tags and edge[1] not in tags]
+        self.__stale = True
+
+    def compact(self,
+                tol: float = 0.0,
+                inputs: Optional[np.ndarray] = None) -> Dict[str, float]:
+        """
+        :param tol: slack allowed on the radii for a sphere to count as
+                containing another (see spherecontains)
+        :param inputs: samples whose best matching prototypes before and
+                after are compared
+        merges every prototype whose sphere lies inside that of another
+        into the largest such sphere, grown to enclose both, provided the
+        grown sphere still passes the vigilance test, a radius of at most
+        (1 - vigilance_)*radialextend_. Counters add up, the samples and
+        edges of a merged prototype go to the prototype absorbing it and
+        the topological clusters are relinked.
+        returns the number of prototypes before and after, of stored
+        labels reassigned and of inputs matched by another prototype (see
+        compactionreport)
+        """
+        centers = self.prototypes_["centers"]
+        radii = self.prototypes_["radii"]
+        nCategories = len(radii)
+        unchanged = compactionreport(nCategories, nCategories, 0, None if inputs is None else 0)
+        if nCategories < 2:
+            return unchanged
+        maxradius = (1 - self.vigilance_)*self.radialextend_
+        root = mergeroots(radii,
+                          lambda start, stop: spherecontains(centers, radii, start, stop, tol,
+                                                             maxradius),
+                          3*nCategories*radii.itemsize)
+        cost = radii + np.sqrt(np.sum((centers - centers[root])**2, axis=1))
+
+        def admitted(root: np.ndarray) -> np.ndarray:
+            extent = radii.copy()
+            np.maximum.at(extent, root, radii + np.sqrt(np.sum((centers - centers[root])**2, axis=1)))
+            return (extent <= maxradius) | (extent == radii)
+
+        root = admitmerges(root, admitted, cost)
+        keep = root == np.arange(nCategories)
+        if keep.all():
+            return unchanged
+        matched = None
+        if inputs is not None:
+            matched = selectwinner(self.choicematch(np.asarray(inputs, dtype=float))[1], axis=-1)
+        extent = radii.copy()
+        np.maximum.at(extent, root, radii + np.sqrt(np.sum((centers - centers[root])**2, axis=1)))
+        tagids = self.__tagids()
+        reassigned = self.__labels_.remap(tagids[~keep], tagids[root[~keep]])
+        tags = self.prototypes_["tag"]
+        alias = {tags[itr]: tags[root[itr]] for itr in np.flatnonzero(~keep)}
+        edges = []
+        for edge in self.edges_:
+            edge = (alias.get(edge[0], edge[0]), alias.get(edge[1], edge[1]))
+            if edge[0] != edge[1] and edge not in edges and edge[::-1] not in edges:
+                edges.append(edge)
+        self.prototypes_["centers"] = centers[keep]
+        self.prototypes_["radii"] = extent[keep]
+        self.prototypes_["counter"] = np.bincount(root, weights=self.prototypes_["counter"],
+                                                  minlength=nCategories)[keep].astype(np.int64)
+        self.prototypes_["tag"] = [tag for (tag, k) in zip(tags, keep) if k]
+        self.edges_ = edges
+        self.topoClusters_ = []
+        self.__addedTags = []
+        self.linkedges()
+        changed = None
+        if inputs is not None:
+            expected = (np.cumsum(keep) - 1)[root][matched]
+            M = self.choicematch(np.asarray(inputs, dtype=float))[1]
+            changed = int(np.count_nonzero(expected != selectwinner(M, axis=-1)))
+        return compactionreport(nCategories, int(np.count_nonzero(keep)), reassigned, changed)
 
     def linkedges(self) -> None:
         """
@@ -177,37 +277,82 @@ class HypersphereTopoART:
             if tag not in self.__addedTags:
                 self.topoClusters_.append([tag])
                 self.__addedTags.append(tag)
+        self.__stale = True
+
+    def predict(self,
+                inputs: np.ndarray) -> np.ndarray:
+        """
+        :param inputs: input(s), one per row
+        returns the topological cluster of the prototype best matching
+        each input, -1 for prototypes not yet linked into a cluster
+        """
+        inputs = np.asarray(inputs, dtype=float)
+        if len(self.prototypes_["radii"]) == 0:
+            return np.full(inputs.shape[:-1], -1, dtype=np.int32)
+        M = self.choicematch(inputs)[1]
+        return self.__prototypeclusters()[selectwinner(M, axis=-1)]
 
     def classify(self,
-                input: np.ndarray) -> List[int]:
-        #This has to change
+                 input: np.ndarray) -> np.ndarray:
         """
         :param input: Input data to be classified
         """
-        input = ComplementCoding(input)
-        labels: List[int] =  []
-        for val in input:
-            T: List[float] = []
-            for prototype in self.prototypes_["weights"]:
-                choice = 1 - (np.sum(np.minimum(prototype, val) - prototype) / \
-                        (np.sum(val)))
-                T.append(choice)
-            location = choice.index(max(choice))
-
-            tag = self.prototypes_["tag"][location]
-            for itr in range(len(self.topoClusters_)):
-                if tag in self.topoClusters_[itr]:
-                    T.append(itr)
+        return self.predict(input)
+
+    @property
+    def labels_(self) -> LabelBuffer:
+        """
+        topological cluster of every presented sample, -1 for samples
+        summarised by pruned prototypes
+        """
+        if self.__stale:
+            self.label()
+        return self.__topolabels
+
+    def __tagids(self) -> np.ndarray:
+        """
+        returns the cycle numbers encoded in the tags of the prototypes
+        """
+        return np.array([int(tag[1:]) for tag in self.prototypes_["tag"]],
+                        dtype=np.int32)
+
+    def __prototypeclusters(self) -> np.ndarray:
+        """
+        returns the topological cluster of every prototype
+        """
+        clusters = np.full(len(self.prototypes_["tag"]), -1, dtype=np.int32)
+        location = {tag: loc for (loc, tag) in enumerate(self.prototypes_["tag"])}
+        for itr in range(len(self.topoClusters_) - 1, -1, -1):
+            for tag in self.topoClusters_[itr]:
+                if tag in location:
+                    clusters[location[tag]] = itr
+        return clusters
 
     def label(self) -> None:
-        self.labels_ = []
-        for tag in self.__labels_:
-            if tag == "d":
-                self.labels_.append(-1)
-            else:
-                for itr in range(len(self.topoClusters_)):
-                    if tag in self.topoClusters_[itr]:
-                        self.labels_.append(itr)
+        tags = self.__tagids()
+        clusters = self.__prototypeclusters()
+        order = np.argsort(tags)
+        tags = tags[order]
+        clusters = clusters[order]
+
+        self.__topolabels.clear()
+        for chunk in self.__labels_.chunks():
+            if len(tags) == 0:
+                self.__topolabels.extend(np.full(len(chunk), -1))
+                continue
+            loc = np.minimum(np.searchsorted(tags, chunk), len(tags) - 1)
+            self.__topolabels.extend(np.where(tags[loc] == chunk,
+                                              clusters[loc], -1))
+        self.__stale = False
+
+    def getlabels(self,
+                  start: int = 0,
+                  stop: Optional[int] = None) -> np.ndarray:
+        """
+        :param start: index of the first sample
+        :param stop: index one past the last sample, the end when None
+        """
+        return self.labels_.get(start, stop)
 
     def getgraph(self) -> IO:
         nclusters = len(self.topoClusters_)
@@ -225,75 +370,109 @@ class HypersphereTopoART:
         G.add_edges(self.edges_)
         return G
 
-    def getlocallabels(self,) -> list:
-        return self.__labels_
+    def getlocallabels(self,
+                       start: int = 0,
+                       stop: Optional[int] = None) -> np.ndarray:
+        """
+        :param start: index of the first sample
+        :param stop: index one past the last sample, the end when None
+        returns the cycle number tagging the prototype that summarised
+        each sample, -1 for samples summarised by pruned prototypes
+        """
+        labels = self.__labels_.get(start, stop)
+        return np.where(np.isin(labels, self.__tagids()), labels, -1)
     
+    def __addprototype(self,
+                       input: np.ndarray) -> int:
+        """
+        :param input: the input committed as a new prototype
+        returns the tag id of the new prototype
+        """
+        input = np.array(input, dtype=float)[None, :]
+        if len(self.prototypes_["radii"]) == 0:
+            self.prototypes_["centers"] = input
+        else:
+            self.prototypes_["centers"] = np.concatenate((self.prototypes_["centers"], input))
+        self.prototypes_["radii"] = np.append(self.prototypes_["radii"], 0.0)
+        self.prototypes_["counter"] = np.append(self.prototypes_["counter"], 1)
+        self.prototypes_["tag"].append(f'p{self.cycle_}')
+        return self.cycle_
+
+    def __update(self,
+                 index: int,
+                 input: np.ndarray,
+                 beta: float) -> None:
+        """
+        :param index: the prototype to be updated
+        :param input: the input the prototype resonated with
+        :param beta: learning rate
+        """
+        (centers, radii) = (self.prototypes_["centers"], self.prototypes_["radii"])
+        dist = euclideandistance(input, centers[index])
+        a: float = 1 - min(radii[index], dist)/dist if dist > 0 else 0.0
+        b: float = input - centers[index]
+        centers[index] += beta*a*b/2
+        a = max(radii[index], dist)
+        b = radii[index]
+        radii[index] += beta*(a - b)/2
+
+    def __observe(self,
+                  input: np.ndarray) -> None:
+        """
+        :param input: the current input
+        widens the bounding box of the inputs seen and grows rmax_ and
+        radialextend_ with it. The centers and radii are kept in input
+        units, so they stay valid as radialextend_ grows and only the
+        uncommitted category's radialextendu_ is rescaled along
+        """
+        if self.lower_ is None:
+            self.lower_ = np.array(input, dtype=float)
+            self.upper_ = np.array(input, dtype=float)
+            return
+        np.minimum(self.lower_, input, out=self.lower_)
+        np.maximum(self.upper_, input, out=self.upper_)
+        rmax = euclideandistance(self.upper_, self.lower_)/2
+        if rmax <= self.rmax_:
+            return
+        self.rmax_ = rmax
+        if rmax > self.radialextend_:
+            self.radialextend_ = rmax
+            self.radialextendu_ = 2*self.radialextend_
+
     def learn(self,
               input: np.ndarray) -> None:
         """
         :param input: the input vector to be fed the ART model
         """
         self.cycle_ += 1
-        if len(self.prototypes_["weights"]) == 0:
-            self.prototypes_["weights"].append([input, 0])
-            self.prototypes_["counter"].append(1)
-            self.prototypes_["tag"].append(f'p{self.cycle_}')
-            self.__labels_.append(f'p{self.cycle_}')
-
+        if self.online_:
+            self.__observe(input)
+        if len(self.prototypes_["radii"]) == 0:
+            self.__labels_.append(self.__addprototype(input))
         else:
-            T = self.choice(input)
-            while not all(val < 0 for val in T):
-                IFW: int = T.index(max(T))
-                print(f"Index = {IFW}")
-                length = len(self.prototypes_["weights"])
-                print(f"#prototypes = {length}")
-                if IFW == len(self.prototypes_["weights"]):
-                    self.prototypes_["weights"].append([input, 0])
-                    self.prototypes_["counter"].append(1)
-                    self.prototypes_["tag"].append(f'p{self.cycle_}')
-                    self.__labels_.append(f'p{self.cycle_}')
-                    break
-                else:
-                    M: float = self.match(input, IFW)
-                    if M >= self.vigilance_:
-                        dist = euclideandistance(input, self.prototypes_["weights"][IFW][0])
-                        a: float = 1 - min(self.prototypes_["weights"][IFW][1], dist)/dist
-                        b: float = input - self.prototypes_["weights"][IFW][0]
-                        self.prototypes_["weights"][IFW][0] += self.beta1_*a*b/2
-                        a = max(self.prototypes_["weights"][IFW][1], dist)
-                        b = self.prototypes_["weights"][IFW][1]
-                        self.prototypes_["weights"][IFW][1] += self.beta1_*(a - b)/2
-                        self.prototypes_["counter"][IFW] += 1
-                        tagFW = self.prototypes_["tag"][IFW]
-                        self.__labels_.append(tagFW)
-                        T[IFW] = -1.0
-                        while not all(val < 0 for val in T):
-                            ISW: int = T.index(max(T))
-                            if ISW == len(self.prototypes_["weights"]):
-                                break
-                            M: float = self.match(input, ISW)
-                            if M >= self.vigilance_:
-                                dist = euclideandistance(input, self.prototypes_["weights"][IFW][0])
-                                a: float = 1 - min(self.prototypes_["weights"][IFW][1], dist)/dist
-                                b: float = input - self.prototypes_["weights"][IFW][0]
-                                self.prototypes_["weights"][IFW][0] += self.beta2_*a*b/2
-                                a = max(self.prototypes_["weights"][IFW][1], dist)
-                                b = self.prototypes_["weights"][IFW][1]
-                                self.prototypes_["weights"][IFW][1] += self.beta2_*(a - b)/2
-                                tagSW = self.prototypes_["tag"][ISW]
-                                if (tagFW, tagSW) not in self.edges_:
-                                    self.edges_.append((tagFW, tagSW))
-                                break
-                            else:
-                                T[ISW] = -1.0
-                        break
-                    else:
-                        T[IFW] = -1.0
-        
+            (T, M) = self.choicematch(input)
+            T = np.append(np.where(M < self.vigilance_, -1.0, T),
+                          self.radialextend_/(self.radialextendu_ + self.alpha_))
+            uncommitted = len(self.prototypes_["radii"])
+            IFW = selectwinner(T)
+            if IFW == uncommitted:
+                self.__labels_.append(self.__addprototype(input))
+            else:
+                self.__update(IFW, input, self.beta1_)
+                self.prototypes_["counter"][IFW] += 1
+                tagFW = self.prototypes_["tag"][IFW]
+                self.__labels_.append(int(tagFW[1:]))
+                T[IFW] = -1.0
+                ISW = selectwinner(T)
+                if ISW != uncommitted:
+                    self.__update(ISW, input, self.beta2_)
+                    tagSW = self.prototypes_["tag"][ISW]
+                    if (tagFW, tagSW) not in self.edges_:
+                        self.edges_.append((tagFW, tagSW))
+
         if self.cycle_%self.tau_ == 0:
             self.prune()
             self.linkedges()
-            self.label()
 
     def fit(self,
             data: np.ndarray,
@@ -0,0 +1,260 @@
+"""
+    ARTPY: A Python library of Adaptive Resonance Theory based learning
+     models.
+
+    This file provides InferenceServer class.
+"""
+
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple, Union
+import numpy as np
+from ..functions import *
+
+__author__ = "Raghu Yelugam"
+__copyright__ = "Copyright 2023"
+__credits__ = ["Leonardo Enzo Brito Da Silva", "Donald Wunsch"]
+__license__ = "GPL"
+__version__ = "0.0.1"
+__maintainer__ = "Raghu Yelugam"
+__email__ = "ry222@mst.edu"
+__status__ = "Release"
+__date__ = "2023.04.13"
+
+
+class InferenceServer:
+    """
+    Serves the predict method of a trained ART model (FuzzyART, TopoART)
+    to concurrent asyncio clients. Requests are collected into
+    micro-batches, closed once maxbatch_ inputs are waiting or maxdelay_
+    seconds after the first of them arrived, and every batch is
+    predicted in a worker thread where the numpy kernels run without
+    holding the GIL. Inputs are passed to predict unchanged, so TopoART
+    clients send complement coded inputs.
+
+    serve and serveunix expose the server over TCP or a Unix socket with
+    a line protocol meant for local testing: a JSON array of numbers is
+    answered with its label, "metrics" with the metrics as JSON.
+    """
+
+    def __init__(self,
+                 model_: Any,
+                 maxbatch_: int = 256,
+                 maxdelay_: float = 0.002,
+                 nworkers_: int = 1,
+                 nlatencies_: int = 4096) -> None:
+        """
+        :param model_: a trained model, or the path of one saved with
+                savemodel
+        :param maxbatch_: maximum number of inputs in a batch
+        :param maxdelay_: maximum time in seconds a request waits for its
+                batch to fill
+        :param nworkers_: number of batches predicted concurrently
+        :param nlatencies_: number of most recent request latencies the
+                latency percentiles are computed over
+        """
+        if isinstance(model_, str):
+            model_ = loadmodel(model_)
+        self.model_ = model_
+        self.maxbatch_: int = maxbatch_
+        self.maxdelay_: float = maxdelay_
+        self.nworkers_: int = nworkers_
+        self.nrequests_: int = 0
+        self.nbatches_: int = 0
+        self.__latencies: np.ndarray = np.zeros(nlatencies_)
+        self.__started: Optional[float] = None
+        self.__queue: Optional[asyncio.Queue] = None
+        self.__executor: Optional[ThreadPoolExecutor] = None
+        self.__batchers: List[asyncio.Task] = []
+
+    def __repr__(self) -> str:
+        m = type(self.model_).__name__
+        b = self.maxbatch_
+        d = self.maxdelay_
+        return f"InferenceServer(model = {m}, maxbatch = {b}, maxdelay = {d})"
+
+    async def start(self) -> None:
+        """
+        start the batching workers, called by predict when needed
+        """
+        if self.__queue is not None:
+            return
+        self.__queue = asyncio.Queue()
+        self.__executor = ThreadPoolExecutor(max_workers=self.nworkers_)
+        self.__started = time.perf_counter()
+        self.__batchers = [asyncio.create_task(self.__batcher())
+                           for _ in range(self.nworkers_)]
+
+    async def stop(self) -> None:
+        """
+        stop the batching workers, cancelling the pending requests and
+        those of the batches being predicted
+        """
+        if self.__queue is None:
+            return
+        for task in self.__batchers:
+            task.cancel()
+        await asyncio.gather(*self.__batchers, return_exceptions=True)
+        while not self.__queue.empty():
+            (_, future, _) = self.__queue.get_nowait()
+            future.cancel()
+        self.__executor.shutdown(wait=True)
+        self.__queue = None
+        self.__batchers = []
+
+    async def predict(self,
+                      input: Union[np.ndarray, List[float]]) -> int:
+        """
+        :param input: a single input to be classified
+        returns the label predicted for the input
+        """
+        await self.start()
+        future = asyncio.get_running_loop().create_future()
+        self.__queue.put_nowait((np.asarray(input), future, time.perf_counter()))
+        return await future
+
+    async def __collect(self) -> List[Tuple[np.ndarray, asyncio.Future, float]]:
+        """
+        returns the next batch of requests
+        """
+        loop = asyncio.get_running_loop()
+        batch = [await self.__queue.get()]
+        deadline = loop.time() + self.maxdelay_
+        while len(batch) < self.maxbatch_:
+            if not self.__queue.empty():
+                batch.append(self.__queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.__queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def __batcher(self) -> None:
+        while True:
+            batch = await self.__collect()
+            try:
+                await self.__run(batch)
+            except asyncio.CancelledError:
+                for (_, future, _) in batch:
+                    if not future.done():
+                        future.cancel()
+                raise
+
+    async def __run(self,
+                    batch: List[Tuple[np.ndarray, asyncio.Future, float]]) -> None:
+        """
+        :param batch: the requests predicted together
+        the requests whose input is not a vector of the model's input
+        width get a ValueError, as numpy would broadcast them into a
+        label. A batch that fails otherwise is retried request by request
+        so that only the bad requests get the exception
+        """
+        width = self.__width()
+        if width is not None:
+            for (input, future, _) in batch:
+                if input.shape != (width,) and not future.done():
+                    error = f"expected an input of shape ({width},), got {input.shape}"
+                    future.set_exception(ValueError(error))
+            batch = [request for request in batch if not request[1].done()]
+            if len(batch) == 0:
+                return
+        loop = asyncio.get_running_loop()
+        try:
+            inputs = np.stack([input for (input, _, _) in batch])
+            labels = await loop.run_in_executor(self.__executor,
+                                                self.model_.predict,
+                                                inputs)
+        except Exception as e:
+            if len(batch) > 1:
+                for request in batch:
+                    await self.__run([request])
+                return
+            if not batch[0][1].done():
+                batch[0][1].set_exception(e)
+            return
+        done = time.perf_counter()
+        for ((_, future, arrived), label) in zip(batch, labels):
+            if not future.done():
+                future.set_result(int(label))
+            self.__latencies[self.nrequests_ % len(self.__latencies)] = done - arrived
+            self.nrequests_ += 1
+        self.nbatches_ += 1
+
+    def __width(self) -> Optional[int]:
+        """
+        returns the input width of the model, None while it has no
+        categories
+        """
+        model = getattr(self.model_, "moduleA_", self.model_)
+        if hasattr(model, "prototypes"):
+            matrix = model.prototypes
+        else:
+            matrix = model.prototypes_.get("weights", model.prototypes_.get("centers"))
+        if matrix is None or np.ndim(matrix) != 2 or len(matrix) == 0:
+            return None
+        return matrix.shape[1]
+
+    def metrics(self) -> Dict[str, float]:
+        """
+        returns the number of requests and batches served, the mean batch
+        size, the throughput in requests per second since start and the
+        latency percentiles in milliseconds of the recent requests
+        """
+        latencies = 1e3*self.__latencies[:min(self.nrequests_, len(self.__latencies))]
+        uptime = 0.0 if self.__started is None else time.perf_counter() - self.__started
+        metrics = {"nrequests": self.nrequests_,
+                   "nbatches": self.nbatches_,
+                   "meanbatchsize": self.nrequests_/max(1, self.nbatches_),
+                   "throughput": self.nrequests_/uptime if uptime > 0 else 0.0}
+        for (name, q) in (("p50", 50), ("p95", 95), ("p99", 99)):
+            metrics[f"latency{name}"] = float(np.percentile(latencies, q)) \
+                if len(latencies) > 0 else 0.0
+        return metrics
+
+    async def __handle(self,
+                       reader: asyncio.StreamReader,
+                       writer: asyncio.StreamWriter) -> None:
+        """
+        :param reader: client stream read line by line
+        :param writer: client stream answered line by line
+        """
+        try:
+            while line := await reader.readline():
+                line = line.strip()
+                if not line:
+                    continue
+                if line == b"metrics":
+                    reply = json.dumps(self.metrics())
+                else:
+                    try:
+                        reply = str(await self.predict(json.loads(line)))
+                    except Exception as e:
+                        reply = f"error: {e}"
+                writer.write(reply.encode() + b"\n")
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve(self,
+                    host: str = "127.0.0.1",
+                    port: int = 0) -> asyncio.AbstractServer:
+        """
+        :param host: interface to listen on
+        :param port: port to listen on, any free port when 0
+        """
+        await self.start()
+        return await asyncio.start_server(self.__handle, host, port)
+
+    async def serveunix(self,
+                        path: str) -> asyncio.AbstractServer:
+        """
+        :param path: Unix socket to listen on
+        """
+        await self.start()
+        return await asyncio.start_unix_server(self.__handle, path)
@@ -0,0 +1,133 @@
+"""
+    ARTPY: A Python library of Adaptive Resonance Theory based learning
+     models.
+
+    This file provides InputCache class.
+"""
+
+from collections import OrderedDict
+from typing import Dict, Tuple
+import numpy as np
+from ..functions import *
+
+__author__ = "Raghu Yelugam"
+__copyright__ = "Copyright 2023"
+__credits__ = ["Leonardo Enzo Brito Da Silva", "Donald Wunsch"]
+__license__ = "GPL"
+__version__ = "0.0.1"
+__maintainer__ = "Raghu Yelugam"
+__email__ = "ry222@mst.edu"
+__status__ = "Release"
+__date__ = "2023.04.13"
+
+
+class InputCache:
+    """
+    Least recently used map from recent inputs to the category they
+    resonated with, letting a model skip the search over all categories
+    for repeated inputs. Inputs are keyed by their bytes, or by their
+    coordinates quantised to step_ so that near duplicates share a key.
+
+    Every entry remembers the version of the model at the time it was
+    stored, and the model bumps its version whenever a category is
+    created or evicted or its weights have drifted enough to possibly
+    change the search result, so the entries stored before miss. A
+    category becoming a better choice than the cached one is such a
+    change, whichever category it is.
+    """
+
+    def __init__(self,
+                 size_: int,
+                 step_: float = 0.0) -> None:
+        """
+        :param size_: maximum number of entries
+        :param step_: quantisation step of the keys, exact keys when 0
+        """
+        self.size_: int = size_
+        self.step_: float = step_
+        self.hits_: int = 0
+        self.misses_: int = 0
+        self.stale_: int = 0
+        self.__entries: "OrderedDict[bytes, Tuple[int, int]]" = OrderedDict()
+
+    def __repr__(self) -> str:
+        s = self.size_
+        q = self.step_
+        return f"InputCache(size = {s}, step = {q})"
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def key(self,
+            input: np.ndarray) -> bytes:
+        """
+        :param input: the input vector, possibly sparse
+        """
+        if issparse(input):
+            input = sparserows(input)
+            values = input.data
+            if self.step_ > 0:
+                values = np.floor(values/self.step_)
+            nonzero = values != 0
+            return input.indices[nonzero].astype(np.int64).tobytes() + b"|" \
+                + values[nonzero].astype(float).tobytes()
+        if self.step_ > 0:
+            return np.floor(np.asarray(input)/self.step_).astype(np.int64).tobytes()
+        return np.asarray(input, dtype=float).tobytes()
+
+    def get(self,
+            key: bytes,
+            version: int) -> int:
+        """
+        :param key: key of the input
+        :param version: current version of the model
+        returns the cached category, -1 on a miss
+        """
+        entry = self.__entries.get(key)
+        if entry is None:
+            self.misses_ += 1
+            return -1
+        (category, stored) = entry
+        if stored != version:
+            del self.__entries[key]
+            self.stale_ += 1
+            self.misses_ += 1
+            return -1
+        self.__entries.move_to_end(key)
+        self.hits_ += 1
+        return category
+
+    def reject(self) -> None:
+        """
+        counts the last hit as a miss, for a model whose cached category
+        no longer passes the vigilance test for the input
+        """
+        self.hits_ -= 1
+        self.misses_ += 1
+
+    def put(self,
+            key: bytes,
+            category: int,
+            version: int) -> None:
+        """
+        :param key: key of the input
+        :param category: category the input resonated with
+        :param version: version of the model after learning the input
+        """
+        self.__entries[key] = (category, int(version))
+        self.__entries.move_to_end(key)
+        if len(self.__entries) > self.size_:
+            self.__entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self.__entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        """
+        returns the hits, misses, stale entries met and the hit rate
+        """
+        lookups = self.hits_ + self.misses_
+        return {"hits": self.hits_,
+                "misses": self.misses_,
+                "stale": self.stale_,
+                "hitrate": self.hits_/lookups if lookups > 0 else 0.0}
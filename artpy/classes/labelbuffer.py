@@ -0,0 +1,236 @@
+"""
+    ARTPY: A Python library of Adaptive Resonance Theory based learning
+     models.
+
+    This file provides LabelBuffer class.
+"""
+
+import os
+import tempfile
+import weakref
+import numpy as np
+from typing import Iterator, Optional
+
+__author__ = "Raghu Yelugam"
+__copyright__ = "Copyright 2023"
+__credits__ = ["Leonardo Enzo Brito Da Silva", "Donald Wunsch"]
+__license__ = "GPL"
+__version__ = "0.0.1"
+__maintainer__ = "Raghu Yelugam"
+__email__ = "ry222@mst.edu"
+__status__ = "Release"
+__date__ = "2023.04.13"
+
+
+def _removefile(path: str) -> None:
+    """
+    :param path: the file to be deleted, if it still exists
+    """
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class LabelBuffer:
+    """
+    Growable int32 store for the per-sample labels of the ART models.
+    Labels are kept in a numpy buffer whose capacity doubles when full,
+    so appending costs amortised O(1) and no Python int is retained per
+    sample.
+
+    storage_ selects where the labels live:
+        "memory": in a numpy array
+        "memmap": in a numpy memmap backed by the file at path_
+        "none": labels are counted but not stored
+    """
+
+    def __init__(self,
+                 storage_: str = "memory",
+                 path_: Optional[str] = None,
+                 capacity_: int = 1024) -> None:
+        """
+        :param storage_: one of "memory", "memmap" or "none"
+        :param path_: file backing the buffer when storage_ is "memmap",
+                a temporary file, deleted with the buffer, is used when
+                not given
+        :param capacity_: initial number of labels the buffer can hold
+        """
+        if storage_ not in ("memory", "memmap", "none"):
+            error = f"expected storage_ in ('memory', 'memmap', 'none'), got {storage_}"
+            raise ValueError(error)
+        self.storage_: str = storage_
+        self.path_: Optional[str] = path_
+        self.nseen_: int = 0
+        self.__size: int = 0
+        self.__buffer: Optional[np.ndarray] = None
+        self.__finalizer: Optional[weakref.finalize] = None
+        if storage_ == "memory":
+            self.__buffer = np.empty(max(capacity_, 1), dtype=np.int32)
+        elif storage_ == "memmap":
+            if self.path_ is None:
+                self.__temporary()
+            self.__buffer = np.memmap(self.path_,
+                                      dtype=np.int32,
+                                      mode="w+",
+                                      shape=(max(capacity_, 1),))
+
+    def __repr__(self) -> str:
+        s = self.storage_
+        n = self.__size
+        return f"LabelBuffer(storage = '{s}', size = {n})"
+
+    def __len__(self) -> int:
+        return self.__size
+
+    def __getitem__(self, index):
+        return self.get()[index]
+
+    def __iter__(self) -> Iterator[int]:
+        for chunk in self.chunks():
+            yield from chunk.tolist()
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        labels = self.get()
+        if dtype is not None:
+            labels = labels.astype(dtype)
+        return labels
+
+    def __temporary(self) -> None:
+        """
+        points path_ to a new temporary file, deleted once the buffer is
+        garbage collected
+        """
+        fd, self.path_ = tempfile.mkstemp(suffix=".labels")
+        os.close(fd)
+        self.__finalizer = weakref.finalize(self, _removefile, self.path_)
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state["_LabelBuffer__finalizer"] = None
+        if self.__buffer is not None:
+            state["_LabelBuffer__buffer"] = np.array(self.get())
+        return state
+
+    def __setstate__(self,
+                     state: dict) -> None:
+        self.__dict__.update(state)
+        if self.storage_ == "memmap":
+            labels = self.__buffer
+            self.__temporary()
+            self.__buffer = np.memmap(self.path_,
+                                      dtype=np.int32,
+                                      mode="w+",
+                                      shape=(max(len(labels), 1),))
+            self.__buffer[:len(labels)] = labels
+        elif self.__buffer is not None and len(self.__buffer) == 0:
+            self.__buffer = np.empty(1, dtype=np.int32)
+
+    def __grow(self,
+               size: int) -> None:
+        """
+        :param size: the number of labels the buffer should hold
+        """
+        capacity = len(self.__buffer)
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        if self.storage_ == "memory":
+            buffer = np.empty(capacity, dtype=np.int32)
+            buffer[:self.__size] = self.__buffer[:self.__size]
+            self.__buffer = buffer
+        else:
+            self.__buffer.flush()
+            del self.__buffer
+            with open(self.path_, "r+b") as f:
+                f.truncate(capacity*np.dtype(np.int32).itemsize)
+            self.__buffer = np.memmap(self.path_,
+                                      dtype=np.int32,
+                                      mode="r+",
+                                      shape=(capacity,))
+
+    def append(self,
+               label: int) -> None:
+        """
+        :param label: label of the latest sample
+        """
+        self.nseen_ += 1
+        if self.__buffer is None:
+            return
+        self.__grow(self.__size + 1)
+        self.__buffer[self.__size] = label
+        self.__size += 1
+
+    def extend(self,
+               labels: np.ndarray) -> None:
+        """
+        :param labels: labels of the latest samples in presentation order
+        """
+        labels = np.asarray(labels, dtype=np.int32).ravel()
+        self.nseen_ += len(labels)
+        if self.__buffer is None:
+            return
+        self.__grow(self.__size + len(labels))
+        self.__buffer[self.__size:self.__size + len(labels)] = labels
+        self.__size += len(labels)
+
+    def clear(self) -> None:
+        """
+        forget the stored labels while keeping the allocated capacity
+        """
+        self.__size = 0
+        self.nseen_ = 0
+
+    def get(self,
+            start: int = 0,
+            stop: Optional[int] = None) -> np.ndarray:
+        """
+        :param start: index of the first sample
+        :param stop: index one past the last sample, the end when None
+        returns a view of the labels of samples start to stop
+        """
+        if self.__buffer is None:
+            return np.empty(0, dtype=np.int32)
+        (start, stop, _) = slice(start, stop).indices(self.__size)
+        return self.__buffer[start:max(start, stop)]
+
+    def chunks(self,
+               chunksize: int = 1 << 20) -> Iterator[np.ndarray]:
+        """
+        :param chunksize: number of labels per chunk
+        yields the stored labels in consecutive chunks, so that memmap
+        backed buffers need not be read into memory at once
+        """
+        for start in range(0, self.__size, chunksize):
+            yield self.get(start, start + chunksize)
+
+    def remap(self,
+              old: np.ndarray,
+              new: np.ndarray) -> int:
+        """
+        :param old: the label values to be replaced
+        :param new: the value replacing each of old
+        rewrites the stored labels in place, chunk by chunk, returns the
+        number of labels given another value
+        """
+        old = np.asarray(old)
+        changed = 0
+        if len(old) == 0:
+            return changed
+        order = np.argsort(old)
+        old = old[order]
+        new = np.asarray(new, dtype=np.int32)[order]
+        for chunk in self.chunks():
+            loc = np.minimum(np.searchsorted(old, chunk), len(old) - 1)
+            hit = old[loc] == chunk
+            changed += int(np.count_nonzero(new[loc[hit]] != chunk[hit]))
+            chunk[hit] = new[loc[hit]]
+        return changed
+
+    def flush(self) -> None:
+        """
+        write pending changes of a memmap backed buffer to disk
+        """
+        if self.storage_ == "memmap":
+            self.__buffer.flush()
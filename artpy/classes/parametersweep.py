@@ -0,0 +1,240 @@
+"""
+    ARTPY: A Python library of Adaptive Resonance Theory based learning
+     models.
+
+    This file provides ParameterSweep class.
+"""
+
+import itertools
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import numpy as np
+from ..functions import *
+from .clusterstatistics import ClusterStatistics
+
+__author__ = "Raghu Yelugam"
+__copyright__ = "Copyright 2023"
+__credits__ = ["Leonardo Enzo Brito Da Silva", "Donald Wunsch"]
+__license__ = "GPL"
+__version__ = "0.0.1"
+__maintainer__ = "Raghu Yelugam"
+__email__ = "ry222@mst.edu"
+__status__ = "Release"
+__date__ = "2023.04.13"
+
+
+def ncategories(model: Any) -> int:
+    """
+    :param model: an ART model
+    returns the number of categories of the model
+    """
+    if hasattr(model, "prototypes"):
+        return len(model.prototypes)
+    if "weights" in model.prototypes_:
+        return len(model.prototypes_["weights"])
+    return len(model.prototypes_["radii"])
+
+
+def categorycentres(model: Any) -> Optional[np.ndarray]:
+    """
+    :param model: an ART model
+    returns the centre of every category in the space of the data the
+    model learns, the complement coded box centres for the fuzzy models,
+    None when the labels are not categories (topological clusters)
+    """
+    if hasattr(model, "topoClusters_"):
+        return None
+    if hasattr(model, "prototypes"):
+        centres = boxcentres(model.prototypes)
+        return np.concatenate((centres, 1 - centres), axis=1)
+    return model.prototypes_["centers"]
+
+
+def summarisemodel(model: Any,
+                   data: np.ndarray,
+                   labels: np.ndarray,
+                   truth: Optional[np.ndarray] = None) -> Dict[str, float]:
+    """
+    :param model: the trained model
+    :param data: the preprocessed training samples
+    :param labels: labels of the training samples, -1 for none
+    :param truth: ground truth labels of the training samples, if known
+    returns the default metrics of ParameterSweep, see
+    ClusterStatistics.summary. Utilisation is over all the categories
+    (topological clusters) of the model and Davies-Bouldin uses the
+    centres of the prototypes when the labels are categories.
+    """
+    assigned = labels[labels >= 0]
+    sizes = np.bincount(assigned) if len(assigned) > 0 else np.zeros(1)
+    statistics = ClusterStatistics()
+    statistics.update(data, labels, truth)
+    metrics = {"nclusters": int(np.count_nonzero(sizes)),
+               "unassigned": 1 - len(assigned)/max(1, len(labels)),
+               "largestcluster": float(sizes.max())/max(1, len(labels))}
+    nCategories = len(model.topoClusters_) if hasattr(model, "topoClusters_") \
+        else ncategories(model)
+    metrics.update(statistics.summary(nCategories, categorycentres(model)))
+    return metrics
+
+
+def fitconfiguration(model: type,
+                     params: Dict[str, Any],
+                     shared: Tuple[str, Tuple[int, ...], str],
+                     truth: Optional[np.ndarray],
+                     batchsize: int,
+                     maxcategories: Optional[int],
+                     checkevery: int,
+                     scorer: Callable) -> Dict[str, Any]:
+    """
+    :param model: the ART model class
+    :param params: keyword arguments of the model
+    :param shared: name, shape and dtype of the shared memory holding the
+            preprocessed data
+    :param truth: ground truth labels passed to scorer
+    :param batchsize: number of observations learnt at once
+    :param maxcategories: the fit stops early once the model has more
+            categories
+    :param checkevery: number of observations between category checks
+    :param scorer: computes the metrics from the model, the data, its
+            labels and truth
+    returns a row of the sweep table, run in the worker processes
+    """
+    (name, shape, dtype) = shared
+    memory = shared_memory.SharedMemory(name=name)
+    try:
+        data = np.ndarray(shape, dtype=dtype, buffer=memory.buf)
+        data.flags.writeable = False
+        instance = model(**params)
+        stopped = False
+        start = time.perf_counter()
+        for first in range(0, len(data), checkevery):
+            chunk = data[first:first + checkevery]
+            if batchsize > 1 and hasattr(instance, "learnbatch"):
+                for itr in range(0, len(chunk), batchsize):
+                    instance.learnbatch(chunk[itr:itr + batchsize])
+            else:
+                for val in chunk:
+                    instance.learn(val)
+            if maxcategories is not None and ncategories(instance) > maxcategories:
+                stopped = True
+                break
+        if hasattr(instance, "prune"):
+            instance.prune()
+            instance.linkedges()
+            instance.label()
+        fittime = time.perf_counter() - start
+
+        row = dict(params)
+        row["ncategories"] = ncategories(instance)
+        row["fittime"] = fittime
+        row["stopped"] = stopped
+        if not stopped:
+            row.update(scorer(instance, data, np.asarray(instance.getlabels()), truth))
+        del data
+        return row
+    finally:
+        memory.close()
+
+
+class ParameterSweep:
+    """
+    Fits one model per point of a hyperparameter grid on a process pool.
+    The data is preprocessed once (complement coding for the fuzzy
+    models, computermax for the hypersphere models, which receive it as
+    rmax_ and, unless swept, radialextend_) and shared with the workers
+    through shared memory instead of being pickled per configuration.
+    Configurations whose category count exceeds maxcategories_ stop
+    early and are reported without metrics.
+    """
+
+    def __init__(self,
+                 model_: type,
+                 grid_: Dict[str, List[Any]],
+                 fixed_: Optional[Dict[str, Any]] = None,
+                 nworkers_: Optional[int] = None,
+                 batchsize_: int = 1,
+                 maxcategories_: Optional[int] = None,
+                 checkevery_: int = 1000,
+                 scorer_: Callable = summarisemodel) -> None:
+        """
+        :param model_: the ART model class, e.g. FuzzyART
+        :param grid_: values of every swept keyword argument of the model,
+                e.g. {"vigilance_": [0.7, 0.8], "beta_": [0.5, 1.0]}
+        :param fixed_: keyword arguments shared by all configurations
+        :param nworkers_: number of worker processes, one per CPU when None
+        :param batchsize_: number of observations learnt at once (see the
+                models' learnbatch)
+        :param maxcategories_: category count above which a configuration
+                is stopped early, never when None
+        :param checkevery_: number of observations between category checks
+        :param scorer_: picklable function of (model, data, labels, truth)
+                returning a dict of metrics
+        """
+        self.model_: type = model_
+        self.grid_: Dict[str, List[Any]] = grid_
+        self.fixed_: Dict[str, Any] = dict(fixed_ or {})
+        self.nworkers_: Optional[int] = nworkers_
+        self.batchsize_: int = batchsize_
+        self.maxcategories_: Optional[int] = maxcategories_
+        self.checkevery_: int = checkevery_
+        self.scorer_: Callable = scorer_
+
+    def __repr__(self) -> str:
+        m = self.model_.__name__
+        n = len(self.configurations())
+        return f"ParameterSweep(model = {m}, configurations = {n})"
+
+    def configurations(self) -> List[Dict[str, Any]]:
+        """
+        returns the keyword arguments of every configuration of the grid
+        """
+        names = list(self.grid_)
+        return [dict(self.fixed_, **dict(zip(names, values)))
+                for values in itertools.product(*(self.grid_[n] for n in names))]
+
+    def preprocess(self,
+                   data: np.ndarray) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """
+        :param data: the raw input data
+        returns the data as the models learn it and the keyword arguments
+        derived from it
+        """
+        data = np.asarray(data, dtype=float)
+        if "rmax_" in self.model_.__init__.__code__.co_varnames:
+            rmax = computermax(data)
+            return (data, {"rmax_": rmax, "radialextend_": rmax})
+        return (np.asarray(complementcoding(data), dtype=float), {})
+
+    def run(self,
+            data: np.ndarray,
+            truth: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
+        """
+        :param data: the raw input data
+        :param truth: ground truth labels passed to the scorer
+        returns one row per configuration, in grid order, holding its
+        parameters, ncategories, fittime, stopped and the metrics
+        """
+        (data, derived) = self.preprocess(data)
+        memory = shared_memory.SharedMemory(create=True, size=max(1, data.nbytes))
+        try:
+            shared = np.ndarray(data.shape, dtype=data.dtype, buffer=memory.buf)
+            shared[:] = data
+            del shared
+            spec = (memory.name, data.shape, data.dtype.str)
+            with ProcessPoolExecutor(max_workers=self.nworkers_) as pool:
+                futures = [pool.submit(fitconfiguration,
+                                       self.model_,
+                                       dict(derived, **params),
+                                       spec,
+                                       truth,
+                                       self.batchsize_,
+                                       self.maxcategories_,
+                                       self.checkevery_,
+                                       self.scorer_)
+                           for params in self.configurations()]
+                return [future.result() for future in futures]
+        finally:
+            memory.close()
+            memory.unlink()
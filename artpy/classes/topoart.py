@@ -6,12 +6,14 @@
 """
 
 import os
-from typing import Dict, List, Tuple, IO
+import copy
+from typing import Dict, List, Optional, Tuple, IO, Union
 from operator import itemgetter
 import numpy as np
 import networkx as nx
 from pyvis.network import Network
 from .. functions import *
+from .labelbuffer import LabelBuffer
 
 __author__ = "Raghu Yelugam"
 __copyright__ = "Copyright 2023"
@@ -30,6 +32,10 @@ class TopoART:
     -hical ART network. In Artificial Neural Networks–ICANN 2010: 20th Inte
     -rnational Conference, Thessaloniki, Greece, September 15-18, 2010, 
     Proceedings, Part III 20 (pp. 157-167). Springer Berlin Heidelberg.
+
+    The inputs are complement coded vectors, or scipy.sparse rows a in
+    [0, 1]^d standing for [a, 1 - a] (see complementcoding), whose choice
+    and match cost O(K nnz) instead of O(K d).
     """
 
     def __init__(self,
@@ -38,7 +44,10 @@ class TopoART:
                  beta1_: float,
                  beta2_: float,
                  phi_: int,
-                 tau_: int) -> None:
+                 tau_: int,
+                 labelstorage_: str = "memory",
+                 labelpath_: Optional[str] = None,
+                 nthreads_: int = 1) -> None:
         """
         :param vigilance_: vigilance value for training the ART model
         :param alpha_: The parameter for the choice function evaluation
@@ -47,6 +56,13 @@ class TopoART:
         :param phi_: The minimum number of samples to be summarised to 
                 be a permanent prototype
         :param tau_: The number of time steps for pruning temporary prototypes
+        :param labelstorage_: where the per-sample labels are kept, one of
+                "memory", "memmap" or "none" (see LabelBuffer)
+        :param labelpath_: file backing the labels when labelstorage_ is
+                "memmap", the topological labels use labelpath_ + ".topo"
+        :param nthreads_: number of threads evaluating the choice and
+                match of blocks of prototypes in parallel (see
+                blockfuzzyand), worthwhile for very many prototypes
         """
         self.vigilance_: float = vigilance_
         self.alpha_: float = alpha_
@@ -55,59 +71,157 @@ class TopoART:
         self.phi_: float = phi_
         self.cycle_: int = 0
         self.tau_: int = tau_
-        self.prototypes_: Dict[List[np.ndarray], List[int], List[str]] = {"weights": [],
-                                                                         "counter": [],
-                                                                         "tag": []}       
-        self.__labels_: List[str] = []
+        self.nthreads_: int = nthreads_
+        self.prototypes_: Dict[str, Union[np.ndarray, List[str]]] = {"weights": np.empty((0, 0)),
+                                                                     "counter": np.empty(0, dtype=np.int64),
+                                                                     "tag": []}
+        self.__labels_: LabelBuffer = LabelBuffer(labelstorage_, labelpath_)
         self.edges_: List[Tuple[str, str]] = []
         self.topoClusters_: List[List[str]] = []
-        self.labels_: List[int] = []
+        topopath = None if labelpath_ is None else labelpath_ + ".topo"
+        self.__topolabels: LabelBuffer = LabelBuffer(labelstorage_, topopath)
+        self.__stale: bool = False
         self.__addedTags: List[str] = []
+        self.winners_: Tuple[int, int, bool] = (-1, -1, False)
+        self.__norms: np.ndarray = np.empty((0, 2))
         
     def choice(self,
-               input: np.ndarray) -> List[float]:
+               input: np.ndarray) -> np.ndarray:
         """
         :param input: current input
         """
-        T: List[float] = []
-        for prototype in self.prototypes_["weights"]:
-            choice = np.sum(np.minimum(prototype, input)) / \
-                    (self.alpha_ + np.sum(prototype))
-            T.append(choice)
-        return T
+        if issparse(input) or self.nthreads_ > 1:
+            return self.choicematch(input)[0]
+        return fuzzyand(self.prototypes_["weights"], input) / \
+            (self.alpha_ + self.prototypes_["weights"].sum(axis=1))
 
     def match(self,
-              input: np.ndarray) -> List[float]:
-        M: List[float] = []
-        for prototype in self.prototypes_["weights"]:
-            match = np.sum(np.minimum(prototype, input))/np.sum(input)
-            M.append(match)
-        return M
-    
+              input: np.ndarray) -> np.ndarray:
+        if issparse(input) or self.nthreads_ > 1:
+            return self.choicematch(input)[1]
+        norm = input.sum(axis=-1)
+        if np.ndim(norm) > 0:
+            norm = norm[:, None]
+        return fuzzyand(self.prototypes_["weights"], input)/norm
+
+    def choicematch(self,
+                    input: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        :param input: current input
+        returns the choice and the match of input from a single fuzzy AND,
+        of shape (B, K) for sparse inputs
+        """
+        if issparse(input):
+            W = self.prototypes_["weights"]
+            norms = self.__halfnorms()
+            intersection = blockfuzzyand(W, input, self.nthreads_, norms)
+            T = intersection/(self.alpha_ + norms.sum(axis=1))
+            return (T, intersection/(W.shape[1]//2))
+        norm = input.sum(axis=-1)
+        if np.ndim(norm) > 0:
+            norm = norm[:, None]
+        if self.nthreads_ > 1:
+            (intersection, norms) = blockfuzzyand(self.prototypes_["weights"], input,
+                                                  self.nthreads_, rownorms=True)
+            return (intersection/(self.alpha_ + norms), intersection/norm)
+        intersection = fuzzyand(self.prototypes_["weights"], input)
+        T = intersection/(self.alpha_ + self.prototypes_["weights"].sum(axis=1))
+        return (T, intersection/norm)
+
+    def __halfnorms(self) -> np.ndarray:
+        """
+        returns the stored halfnorms of the prototypes, recomputed when
+        out of step with them
+        """
+        if len(self.__norms) != len(self.prototypes_["weights"]):
+            self.__norms = halfnorms(self.prototypes_["weights"])
+        return self.__norms
+
     def prune(self) -> None:
         """
         prune the prototypes with count less than self.tau_
-        replace label for samples summarised by pruned prototypes
-        with "d"
-        """
-        counts = np.array(self.prototypes_["counter"])
-        pruneLocations = np.where(counts<self.phi_)[0]
-        pruneLocations[::-1].sort()
-        tags = []
-        for index in pruneLocations:
-            del self.prototypes_["weights"][index]
-            del self.prototypes_["counter"][index]
-            tags.append(self.prototypes_["tag"].pop(index))
-        itr = 0
-        while itr < len(self.edges_):
-            if self.edges_[itr][0] in tags \
-             or self.edges_[itr][1] in tags:
-                self.edges_.remove(self.edges_[itr])
-                itr -= 1
-            itr += 1
-        for (loc, x) in enumerate(self.__labels_):
-            if x in tags:
-                self.__labels_[loc] = "d"
+        samples summarised by pruned prototypes are labelled -1 when the
+        labels are read, tags are never reused so the stored labels need
+        not be rewritten
+        """
+        keep = self.prototypes_["counter"] >= self.phi_
+        tags = {tag for (tag, k) in zip(self.prototypes_["tag"], keep) if not k}
+        self.prototypes_["weights"] = self.prototypes_["weights"][keep]
+        if len(self.__norms) == len(keep):
+            self.__norms = self.__norms[keep]
+        self.prototypes_["counter"] = self.prototypes_["counter"][keep]
+        self.prototypes_["tag"] = [tag for (tag, k) in zip(self.prototypes_["tag"], keep) if k]
+        self.edges_ = [edge for edge in self.edges_
+                       if edge[0] not in tags and edge[1] not in tags]
+        self.__stale = True
+
+    def compact(self,
+                tol: float = 0.0,
+                inputs: Optional[np.ndarray] = None) -> Dict[str, float]:
+        """
+        :param tol: slack allowed on every side of a box for it to count
+                as containing another (see boxcontains)
+        :param inputs: complement coded samples whose best matching
+                prototypes before and after are compared
+        merges every prototype whose box lies inside that of another into
+        the largest such box, grown to the hull of both, provided the hull
+        still passes the vigilance test, |hull|_1 >= vigilance_*d.
+        Counters add up, the samples and edges of a merged prototype go to
+        the prototype absorbing it and the topological clusters are
+        relinked. For tol = 0 the absorbing boxes are left as they are, so
+        only the inputs that chose a merged prototype can be assigned
+        differently.
+        returns the number of prototypes before and after, of stored
+        labels reassigned and of inputs matched by another prototype (see
+        compactionreport)
+        """
+        W = self.prototypes_["weights"]
+        nCategories = len(W)
+        unchanged = compactionreport(nCategories, nCategories, 0, None if inputs is None else 0)
+        if nCategories < 2:
+            return unchanged
+        minnorm = self.vigilance_*(W.shape[1]//2)
+        root = mergeroots(-W.sum(axis=1),
+                          lambda start, stop: boxcontains(W, start, stop, tol, minnorm),
+                          2*nCategories*W.shape[1]*W.itemsize)
+        sums = W.sum(axis=1)
+
+        def admitted(root: np.ndarray) -> np.ndarray:
+            hull = W.copy()
+            np.minimum.at(hull, root, W)
+            norms = hull.sum(axis=1)
+            return (norms >= minnorm) | (norms == sums)
+
+        root = admitmerges(root, admitted, -np.minimum(W, W[root]).sum(axis=1))
+        keep = root == np.arange(nCategories)
+        if keep.all():
+            return unchanged
+        matched = None if inputs is None else self.__bestprototypes(inputs)
+        hull = W.copy()
+        np.minimum.at(hull, root, W)
+        tagids = self.__tagids()
+        reassigned = self.__labels_.remap(tagids[~keep], tagids[root[~keep]])
+        tags = self.prototypes_["tag"]
+        alias = {tags[itr]: tags[root[itr]] for itr in np.flatnonzero(~keep)}
+        edges = []
+        for edge in self.edges_:
+            edge = (alias.get(edge[0], edge[0]), alias.get(edge[1], edge[1]))
+            if edge[0] != edge[1] and edge not in edges and edge[::-1] not in edges:
+                edges.append(edge)
+        self.prototypes_["weights"] = hull[keep]
+        self.__norms = halfnorms(self.prototypes_["weights"])
+        self.prototypes_["counter"] = np.bincount(root, weights=self.prototypes_["counter"],
+                                                  minlength=nCategories)[keep].astype(np.int64)
+        self.prototypes_["tag"] = [tag for (tag, k) in zip(tags, keep) if k]
+        self.edges_ = edges
+        self.topoClusters_ = []
+        self.__addedTags = []
+        self.linkedges()
+        changed = None
+        if inputs is not None:
+            expected = (np.cumsum(keep) - 1)[root][matched]
+            changed = int(np.count_nonzero(expected != self.__bestprototypes(inputs)))
+        return compactionreport(nCategories, int(np.count_nonzero(keep)), reassigned, changed)
 
     def linkedges(self) -> None:
         """
@@ -149,36 +263,128 @@ class TopoART:
             if tag not in self.__addedTags:
                 self.topoClusters_.append([tag])
                 self.__addedTags.append(tag)
+        self.__stale = True
+
+    def predict(self,
+                inputs: np.ndarray) -> np.ndarray:
+        """
+        :param inputs: complement coded input(s), one per row
+        returns the topological cluster of the prototype best matching
+        each input, -1 for prototypes not yet linked into a cluster
+        """
+        if len(self.prototypes_["weights"]) == 0:
+            if issparse(inputs):
+                return np.full(sparserows(inputs).shape[0], -1, dtype=np.int32)
+            return np.full(np.shape(inputs)[:-1], -1, dtype=np.int32)
+        return self.__prototypeclusters()[self.__bestprototypes(inputs)]
+
+    def __bestprototypes(self,
+                         inputs: np.ndarray) -> np.ndarray:
+        """
+        :param inputs: complement coded input(s), one per row
+        returns the index of the prototype best matching each input
+        """
+        W = self.prototypes_["weights"]
+        if issparse(inputs):
+            inputs = sparserows(inputs)
+            norms = self.__halfnorms()
+            intersection = blockfuzzyand(W, inputs, self.nthreads_, norms)
+            z = 1 - (norms.sum(axis=1) - intersection)/(W.shape[1]//2)
+            return selectwinner(z, axis=-1)
+        inputs = np.asarray(inputs)
+        norm = inputs.sum(axis=-1)
+        if np.ndim(norm) > 0:
+            norm = norm[:, None]
+        if self.nthreads_ > 1:
+            (intersection, norms) = blockfuzzyand(W, inputs, self.nthreads_, rownorms=True)
+            z = 1 - (norms - intersection)/norm
+        else:
+            z = 1 - (W.sum(axis=1) - fuzzyand(W, inputs))/norm
+        return selectwinner(z, axis=-1)
 
     def classify(self,
-                input: np.ndarray) -> List[int]:
+                input: np.ndarray) -> np.ndarray:
         """
         :param input: Input data to be classified
         """
-        input = ComplementCoding(input)
-        labels: List[int] =  []
-        for val in input:
-            T: List[float] = []
-            for prototype in self.prototypes_["weights"]:
-                choice = 1 - (np.sum(np.minimum(prototype, val) - prototype) / \
-                        (np.sum(val)))
-                T.append(choice)
-            location = choice.index(max(choice))
-
-            tag = self.prototypes_["tag"][location]
-            for itr in range(len(self.topoClusters_)):
-                if tag in self.topoClusters_[itr]:
-                    T.append(itr)
+        coded = complementcoding(input)
+        return self.predict(coded if issparse(coded) else np.asarray(coded))
+
+    @property
+    def labels_(self) -> LabelBuffer:
+        """
+        topological cluster of every presented sample, -1 for samples
+        summarised by pruned prototypes
+        """
+        if self.__stale:
+            self.label()
+        return self.__topolabels
+
+    def __tagids(self) -> np.ndarray:
+        """
+        returns the cycle numbers encoded in the tags of the prototypes
+        """
+        return np.array([int(tag[1:]) for tag in self.prototypes_["tag"]],
+                        dtype=np.int32)
+
+    def __prototypeclusters(self) -> np.ndarray:
+        """
+        returns the topological cluster of every prototype
+        """
+        clusters = np.full(len(self.prototypes_["tag"]), -1, dtype=np.int32)
+        location = {tag: loc for (loc, tag) in enumerate(self.prototypes_["tag"])}
+        for itr in range(len(self.topoClusters_) - 1, -1, -1):
+            for tag in self.topoClusters_[itr]:
+                if tag in location:
+                    clusters[location[tag]] = itr
+        return clusters
 
     def label(self) -> None:
-        self.labels_ = []
-        for tag in self.__labels_:
-            if tag == "d":
-                self.labels_.append(-1)
-            else:
-                for itr in range(len(self.topoClusters_)):
-                    if tag in self.topoClusters_[itr]:
-                        self.labels_.append(itr)
+        tags = self.__tagids()
+        clusters = self.__prototypeclusters()
+        order = np.argsort(tags)
+        tags = tags[order]
+        clusters = clusters[order]
+
+        self.__topolabels.clear()
+        for chunk in self.__labels_.chunks():
+            if len(tags) == 0:
+                self.__topolabels.extend(np.full(len(chunk), -1))
+                continue
+            loc = np.minimum(np.searchsorted(tags, chunk), len(tags) - 1)
+            self.__topolabels.extend(np.where(tags[loc] == chunk,
+                                              clusters[loc], -1))
+        self.__stale = False
+
+    def snapshot(self) -> "TopoART":
+        """
+        returns a read-only copy of the prototypes and topology that keeps
+        predicting consistently while this model goes on learning, labels
+        are not copied
+        """
+        snapshot = copy.copy(self)
+        snapshot.prototypes_ = {"weights": self.prototypes_["weights"].copy(),
+                                "counter": self.prototypes_["counter"].copy(),
+                                "tag": list(self.prototypes_["tag"])}
+        snapshot.prototypes_["weights"].flags.writeable = False
+        snapshot.prototypes_["counter"].flags.writeable = False
+        snapshot.__norms = self.__halfnorms().copy()
+        snapshot.edges_ = list(self.edges_)
+        snapshot.topoClusters_ = [list(cluster) for cluster in self.topoClusters_]
+        snapshot.__addedTags = list(self.__addedTags)
+        snapshot.__labels_ = LabelBuffer("none")
+        snapshot.__topolabels = LabelBuffer("none")
+        snapshot.__stale = False
+        return snapshot
+
+    def getlabels(self,
+                  start: int = 0,
+                  stop: Optional[int] = None) -> np.ndarray:
+        """
+        :param start: index of the first sample
+        :param stop: index one past the last sample, the end when None
+        """
+        return self.labels_.get(start, stop)
 
     def getgraph(self) -> IO:
         nclusters = len(self.topoClusters_)
@@ -196,81 +402,230 @@ class TopoART:
         G.add_edges(self.edges_)
         return G
             
-    def getlocallabels(self,) -> list:
-        return self.__labels_
+    def getlocallabels(self,
+                       start: int = 0,
+                       stop: Optional[int] = None) -> np.ndarray:
+        """
+        :param start: index of the first sample
+        :param stop: index one past the last sample, the end when None
+        returns the cycle number tagging the prototype that summarised
+        each sample, -1 for samples summarised by pruned prototypes
+        """
+        labels = self.__labels_.get(start, stop)
+        return np.where(np.isin(labels, self.__tagids()), labels, -1)
 
-    def learn(self,
-              input: np.ndarray) -> None:
+    def __addprototype(self,
+                       input: np.ndarray) -> int:
+        """
+        :param input: the input committed as a new prototype
+        returns the tag id of the new prototype
+        """
+        if issparse(input):
+            input = densecomplement(input)[0]
+        input = np.asarray(input, dtype=float)[None, :]
+        norms = self.__halfnorms()
+        if len(self.prototypes_["weights"]) == 0:
+            self.prototypes_["weights"] = input.copy()
+        else:
+            self.prototypes_["weights"] = np.concatenate((self.prototypes_["weights"], input))
+        self.__norms = np.concatenate((norms, halfnorms(input)))
+        self.prototypes_["counter"] = np.append(self.prototypes_["counter"], 1)
+        self.prototypes_["tag"].append(f'p{self.cycle_}')
+        return self.cycle_
+
+    def __update(self,
+                 index: Union[int, np.ndarray],
+                 input: np.ndarray,
+                 beta: float) -> None:
+        """
+        :param index: the prototype(s) to be updated
+        :param input: the input(s) the prototypes resonated with
+        :param beta: learning rate
+        """
+        if issparse(input):
+            input = densecomplement(input)[0]
+        W = self.prototypes_["weights"]
+        W[index] = (1 - beta)*W[index] + beta*np.minimum(input, W[index])
+        if len(self.__norms) == len(W):
+            self.__norms[index] = halfnorms(W[index])
+
+    def __resonate(self,
+                   input: np.ndarray,
+                   T: Optional[np.ndarray] = None,
+                   M: Optional[np.ndarray] = None) -> int:
         """
         :param input: the input vector to be fed the ART model
+        :param T: precomputed choice of input, see learn
+        :param M: precomputed match of input, see learn
+        returns the tag id of the prototype summarising the input
         """
-        level: int = 0
-        self.cycle_ += 1
         if len(self.prototypes_["weights"]) == 0:
-            self.prototypes_["weights"].append(input)
-            self.prototypes_["counter"].append(1)
-            self.prototypes_["tag"].append(f'p{self.cycle_}')
-            self.__labels_.append(f'p{self.cycle_}')
+            self.winners_ = (len(self.prototypes_["weights"]), -1, True)
+            return self.__addprototype(input)
+
+        if T is None or M is None:
+            (T, M) = self.choicematch(input)
+        T = np.where(M < self.vigilance_, -1.0, T).ravel()
+        IFW: int = selectwinner(T)
+        if T[IFW] < 0:
+            self.winners_ = (len(self.prototypes_["weights"]), -1, True)
+            return self.__addprototype(input)
+        self.__update(IFW, input, self.beta1_)
+        self.prototypes_["counter"][IFW] += 1
+        tagFW = self.prototypes_["tag"][IFW]
 
+        T[IFW] = -1.0
+        ISW: int = selectwinner(T)
+        if T[ISW] >= 0:
+            self.__update(ISW, input, self.beta2_)
+            tagSW = self.prototypes_["tag"][ISW]
+            if (tagFW, tagSW) not in self.edges_:
+                self.edges_.append((tagFW, tagSW))
         else:
-            T = self.choice(input)
-            M = self.match(input)
-            l = len(self.__labels_)
-            while not all(val < 0 for val in T):
-                IFW: int = T.index(max(T))
-                if M[IFW] >= self.vigilance_:
-                    self.prototypes_["weights"][IFW] = \
-                        (1-self.beta1_)*self.prototypes_["weights"][IFW] \
-                        + self.beta1_*np.minimum(input,self.prototypes_["weights"][IFW])
-                    self.prototypes_["counter"][IFW] += 1
-                    tagFW = self.prototypes_["tag"][IFW]
-                    self.__labels_.append(tagFW)
-                    T[IFW] = -1.0
-
-                    while not all(val < 0 for val in T):
-                        ISW: int = T.index(max(T))
-                        if M[ISW] >= self.vigilance_:
-                            self.prototypes_["weights"][ISW] = \
-                                (1-self.beta2_)*self.prototypes_["weights"][ISW] \
-                                + self.beta2_*np.minimum(input,self.prototypes_["weights"][ISW])
-                            tagSW = self.prototypes_["tag"][ISW]
-                            if (tagFW, tagSW) not in self.edges_:
-                                self.edges_.append((tagFW, tagSW))
-                            break
-                        else:
-                            T[ISW] = -1.0
-                    break
-                else:
-                    T[IFW] = -1.0
+            ISW = -1
+        self.winners_ = (IFW, ISW, False)
+        return int(tagFW[1:])
 
-            if all(val < 0 for val in T) and \
-             l == len(self.__labels_):
-                self.prototypes_["weights"].append(input)
-                self.prototypes_["counter"].append(1)
-                self.prototypes_["tag"].append(f'p{self.cycle_}')
-                self.__labels_.append(f'p{self.cycle_}')
+    def learn(self,
+              input: np.ndarray,
+              T: Optional[np.ndarray] = None,
+              M: Optional[np.ndarray] = None) -> None:
+        """
+        :param input: the input vector to be fed the ART model
+        :param T: choice of input as returned by choice, computed when
+                None, lets models with identical prototypes share it
+        :param M: match of input as returned by match, computed when None
+        """
+        self.cycle_ += 1
+        self.__labels_.append(self.__resonate(input, T, M))
 
         if self.cycle_%self.tau_ == 0:
             self.prune()
             self.linkedges()
-            self.label()
+
+    def __aggregate(self,
+                    index: np.ndarray,
+                    inputs: np.ndarray,
+                    beta: float) -> np.ndarray:
+        """
+        :param index: the winning prototype of each input
+        :param inputs: the inputs
+        :param beta: learning rate
+        updates every winning prototype once with the fuzzy AND of the
+        inputs it won, returns the number of inputs each prototype won
+        """
+        if len(index) == 0:
+            return np.zeros(len(self.prototypes_["weights"]), dtype=np.int64)
+        if issparse(inputs):
+            inputs = densecomplement(inputs)
+        order = np.argsort(index, kind="stable")
+        index = index[order]
+        starts = np.flatnonzero(np.r_[True, index[1:] != index[:-1]])
+        X = np.minimum.reduceat(inputs[order], starts, axis=0)
+        self.__update(index[starts], X, beta)
+        return np.bincount(index, minlength=len(self.prototypes_["weights"]))
+
+    def __learnchunk(self,
+                     inputs: np.ndarray) -> None:
+        """
+        :param inputs: inputs that do not cross a pruning step
+        """
+        cycle = self.cycle_
+        nSamples = inputs.shape[0]
+        labels = np.full(nSamples, -1, dtype=np.int32)
+        if len(self.prototypes_["weights"]) > 0:
+            rows = np.arange(nSamples)
+            (T, M) = self.choicematch(inputs)
+            T[M < self.vigilance_] = -1.0
+            IFW = selectwinner(T, axis=1)
+            resolved = T[rows, IFW] >= 0
+            T[rows, IFW] = -1.0
+            ISW = selectwinner(T, axis=1)
+            second = resolved & (T[rows, ISW] >= 0)
+
+            tags = self.prototypes_["tag"]
+            tagids = np.array([int(tag[1:]) for tag in tags], dtype=np.int32)
+            labels[resolved] = tagids[IFW[resolved]]
+            self.prototypes_["counter"] += self.__aggregate(IFW[resolved],
+                                                            inputs[resolved],
+                                                            self.beta1_)
+            self.__aggregate(ISW[second], inputs[second], self.beta2_)
+            edges = set(self.edges_)
+            for (fw, sw) in zip(IFW[second], ISW[second]):
+                edge = (tags[fw], tags[sw])
+                if edge not in edges:
+                    edges.add(edge)
+                    self.edges_.append(edge)
+
+        for itr in np.flatnonzero(labels < 0):
+            self.cycle_ = cycle + itr + 1
+            labels[itr] = self.__resonate(inputs[itr:itr + 1] if issparse(inputs) else inputs[itr])
+        self.cycle_ = cycle + nSamples
+        self.__labels_.extend(labels)
+
+        if self.cycle_%self.tau_ == 0:
+            self.prune()
+            self.linkedges()
+
+    def learnbatch(self,
+                   inputs: np.ndarray) -> None:
+        """
+        Approximate mini-batch learning. The choice and match of all the
+        inputs are evaluated at once against the prototypes as they were
+        at the start of the batch, giving each input its first and second
+        winner. Every first (second) winner is then updated once with
+        the fuzzy AND of the inputs it won using beta1_ (beta2_), first
+        winner updates preceding second winner updates, and the inputs no
+        prototype resonated with are learnt sequentially afterwards.
+        Batches are split at multiples of tau_ so pruning happens at the
+        same cycles as with learn.
+
+        The local labels diverge from those of learn when, within a
+        batch, an input would have resonated with a prototype created or
+        moved by an earlier input of the same batch, and when beta1_ or
+        beta2_ < 1 since a prototype receives a single update per batch.
+        A batch of one input is identical to learn.
+
+        :param inputs: the complement coded input vectors, one per row
+        """
+        inputs = sparserows(inputs) if issparse(inputs) else np.asarray(inputs)
+        start = 0
+        while start < inputs.shape[0]:
+            stop = min(inputs.shape[0], start + self.tau_ - self.cycle_%self.tau_)
+            self.__learnchunk(inputs[start:stop])
+            start = stop
 
     def fit(self,
             data: np.ndarray,
-            verbose: bool = False) -> None:
+            verbose: bool = False,
+            batchsize: int = 1) -> None:
         """
         :param data: the input data for the ART model
+        :param verbose: to print verbose
+        :param batchsize: number of observations learnt at once, values
+                above 1 trade fidelity to the sequential algorithm for
+                throughput (see learnbatch)
         """
-        data = ComplementCoding(data)
-        temp = 0
-        for val in data:
-            temp += 1
-            if verbose:
-                print(f"Presenting observation #{temp}")
-            self.learn(val)
+        data = complementcoding(data)
+        if batchsize > 1:
+            data = data if issparse(data) else np.asarray(data)
+            for start in range(0, data.shape[0], batchsize):
+                if verbose:
+                    stop = min(data.shape[0], start + batchsize)
+                    print(f"Presenting observations #{start + 1}-#{stop}")
+                self.learnbatch(data[start:start + batchsize])
+        else:
+            if issparse(data):
+                rows = data
+                data = (rows[itr:itr + 1] for itr in range(rows.shape[0]))
+            temp = 0
+            for val in data:
+                temp += 1
+                if verbose:
+                    print(f"Presenting observation #{temp}")
+                self.learn(val)
         self.prune()
         self.linkedges()
         self.label()
         if verbose:
             print("Done learning")
-
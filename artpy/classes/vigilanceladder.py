@@ -0,0 +1,211 @@
+"""
+    ARTPY: A Python library of Adaptive Resonance Theory based learning
+     models.
+
+    This file provides VigilanceLadder class.
+"""
+
+from typing import Any, Dict, List, Optional
+import numpy as np
+from ..functions import *
+from .topoart import TopoART
+from .parametersweep import ncategories
+
+__author__ = "Raghu Yelugam"
+__copyright__ = "Copyright 2023"
+__credits__ = ["Leonardo Enzo Brito Da Silva", "Donald Wunsch"]
+__license__ = "GPL"
+__version__ = "0.0.1"
+__maintainer__ = "Raghu Yelugam"
+__email__ = "ry222@mst.edu"
+__status__ = "Release"
+__date__ = "2023.04.13"
+
+
+class VigilanceLadder:
+    """
+    Trains one FuzzyART or TopoART layer per vigilance in a single pass
+    over the data, giving clusterings of the same data at several
+    granularities. The choice and match of an input do not depend on the
+    vigilance, so the ladder keeps the prototypes of all the layers in
+    one matrix and computes the fuzzy AND of every input with all of
+    them in a single kernel call, each layer's learn receiving the
+    choice and match of its own rows. The rows a layer changes while
+    learning (see the models' winners_) are copied back after every
+    input.
+
+    Layers of different vigilances hold different prototypes within a
+    few inputs, so the fuzzy AND costs what it costs independent fits,
+    nrows_ counting the rows evaluated. What is saved is one kernel call
+    per input instead of one per layer (nevaluations_ against
+    len(layers_)*nsamples_) and the norms of the prototypes, kept up to
+    date instead of recomputed for every input, so the ladder costs
+    about as much as independent fits minus those, not as much as one
+    fit.
+    """
+
+    def __init__(self,
+                 model_: type,
+                 vigilances_: List[float],
+                 params_: Optional[Dict[str, Any]] = None) -> None:
+        """
+        :param model_: the layer class, FuzzyART or TopoART
+        :param vigilances_: vigilance of every layer, the layers are
+                ordered by increasing vigilance
+        :param params_: the other keyword arguments of the layers
+        """
+        self.model_: type = model_
+        self.vigilances_: List[float] = sorted(vigilances_)
+        self.layers_: List[Any] = [model_(vigilance_=v, **(params_ or {}))
+                                   for v in self.vigilances_]
+        self.nevaluations_: int = 0
+        self.nrows_: int = 0
+        self.nsamples_: int = 0
+        self.__weights: np.ndarray = np.empty((0, 0))
+        self.__sums: np.ndarray = np.empty(0)
+        self.__nrows: int = 0
+        self.__rows: List[np.ndarray] = [np.empty(0, dtype=np.int64) for _ in self.layers_]
+        self.__sources: List[Optional[np.ndarray]] = [None for _ in self.layers_]
+
+    def __repr__(self) -> str:
+        m = self.model_.__name__
+        v = self.vigilances_
+        r = self.__nrows
+        return f"VigilanceLadder(model = {m}, vigilances = {v}, rows = {r})"
+
+    @staticmethod
+    def __prototypes(layer: Any) -> np.ndarray:
+        """
+        :param layer: a FuzzyART or TopoART layer
+        returns the prototype matrix of the layer
+        """
+        if hasattr(layer, "prototypes"):
+            return layer.prototypes
+        return layer.prototypes_["weights"]
+
+    def __push(self,
+               W: np.ndarray) -> np.ndarray:
+        """
+        :param W: prototypes appended to the shared matrix
+        returns their rows in the shared matrix
+        """
+        (start, stop) = (self.__nrows, self.__nrows + len(W))
+        if stop > len(self.__weights) or self.__weights.shape[1] != W.shape[1]:
+            size = max(16, stop, 2*len(self.__weights))
+            weights = np.empty((size, W.shape[1]), dtype=W.dtype)
+            sums = np.empty(size, dtype=W.dtype)
+            if start > 0:
+                weights[:start] = self.__weights[:start]
+                sums[:start] = self.__sums[:start]
+            (self.__weights, self.__sums) = (weights, sums)
+        self.__weights[start:stop] = W
+        self.__sums[start:stop] = W.sum(axis=1)
+        self.__nrows = stop
+        return np.arange(start, stop)
+
+    def __rebuild(self) -> None:
+        """
+        copies the prototypes of every layer into the shared matrix anew,
+        after a layer reordered them (pruning)
+        """
+        self.__nrows = 0
+        for (itr, layer) in enumerate(self.layers_):
+            W = self.__prototypes(layer)
+            self.__sources[itr] = W
+            self.__rows[itr] = self.__push(W) if len(W) > 0 else np.empty(0, dtype=np.int64)
+
+    def __sync(self,
+               itr: int) -> None:
+        """
+        :param itr: index of the layer that just learnt an input
+        copies the rows the layer changed into the shared matrix. Updates
+        are made in place and new prototypes are appended to a new
+        matrix, any other new matrix means the layer reordered its
+        prototypes.
+        """
+        layer = self.layers_[itr]
+        W = self.__prototypes(layer)
+        rows = self.__rows[itr]
+        if W is not self.__sources[itr]:
+            if len(W) != len(rows) + 1:
+                self.__rebuild()
+                return
+            self.__sources[itr] = W
+            rows = np.append(rows, self.__push(W[-1:]))
+            self.__rows[itr] = rows
+        for index in layer.winners_[:-1]:
+            if 0 <= index < len(rows):
+                self.__weights[rows[index]] = W[index]
+                self.__sums[rows[index]] = W[index].sum()
+
+    def learn(self,
+              input: np.ndarray) -> None:
+        """
+        :param input: the input vector to be fed every layer, sparse
+                inputs are evaluated by every layer on its own
+        """
+        choicematch = [(None, None) for _ in self.layers_]
+        if self.__nrows > 0 and not issparse(input):
+            intersection = blockfuzzyand(self.__weights[:self.__nrows], input,
+                                         getattr(self.layers_[0], "nthreads_", 1))
+            norm = input.sum(axis=-1)
+            self.nevaluations_ += 1
+            self.nrows_ += self.__nrows
+            # sliced before any layer learns, a layer pruning renumbers the rows
+            for (itr, layer) in enumerate(self.layers_):
+                rows = self.__rows[itr]
+                if len(rows) > 0:
+                    own = intersection[rows]
+                    sums = self.__sums[rows]
+                    # a zero input matches the empty prototypes only, as in FuzzyART
+                    M = own/norm if norm != 0 else (sums == 0).astype(float)
+                    choicematch[itr] = (own/(layer.alpha_ + sums), M)
+        for (itr, layer) in enumerate(self.layers_):
+            layer.learn(input, *choicematch[itr])
+            self.__sync(itr)
+        self.nsamples_ += 1
+
+    def fit(self,
+            data: np.ndarray,
+            verbose: bool = False) -> None:
+        """
+        :param data: the input data, complement coded here for TopoART
+                layers as in TopoART.fit
+        :param verbose: to print verbose
+        """
+        topological = isinstance(self.layers_[0], TopoART)
+        if topological:
+            data = complementcoding(data)
+        temp = 0
+        for val in data:
+            temp += 1
+            if verbose:
+                print(f"Presenting observation #{temp}")
+            self.learn(val)
+        if topological:
+            for layer in self.layers_:
+                layer.prune()
+                layer.linkedges()
+                layer.label()
+        if verbose:
+            print("Done learning")
+
+    def getlabels(self,
+                  layer: int,
+                  start: int = 0,
+                  stop: Optional[int] = None) -> np.ndarray:
+        """
+        :param layer: index of the layer, in order of increasing vigilance
+        :param start: index of the first sample
+        :param stop: index one past the last sample, the end when None
+        """
+        return self.layers_[layer].getlabels(start, stop)
+
+    def predict(self,
+                inputs: np.ndarray) -> np.ndarray:
+        """
+        :param inputs: input(s) to be classified, one per row
+        returns the labels predicted by every layer, stacked along the
+        first axis in order of increasing vigilance
+        """
+        return np.stack([layer.predict(inputs) for layer in self.layers_])
@@ -7,4 +7,11 @@ from .complementcoding import *
 from .generateclustercolors import *
 from .distance import *
 from .computermax import *
-
+from .fuzzyand import *
+from .sparseinput import *
+from .blockkernels import *
+from .determinism import *
+from .compaction import *
+from .eviction import *
+from .persistence import *
+from .metrics import *
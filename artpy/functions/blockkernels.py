@@ -0,0 +1,146 @@
+"""
+    ARTPY: A Python library of Adaptive Resonance Theory based learning
+     models.
+
+     This file provides the functions evaluating prototype matrices in
+     cache-sized blocks of categories on a thread pool.
+"""
+
+import os
+import typing
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+import numpy as np
+from .fuzzyand import fuzzyand
+from .sparseinput import issparse, sparserows, sparsefuzzyand
+
+_pools: Dict[int, ThreadPoolExecutor] = {}
+
+
+def threadpool(nthreads: int) -> ThreadPoolExecutor:
+    """
+    :param nthreads: number of threads
+    returns the process wide thread pool of nthreads threads, created on
+    first use and shared by all the models
+    """
+    if nthreads not in _pools:
+        _pools[nthreads] = ThreadPoolExecutor(max_workers=nthreads,
+                                              thread_name_prefix="artpy")
+    return _pools[nthreads]
+
+
+if hasattr(os, "register_at_fork"):
+    # a forked child inherits the pools but not their threads, it starts
+    # its own on first use
+    os.register_at_fork(after_in_child=_pools.clear)
+
+
+def blockrows(nCols: int,
+              blockbytes: int = 1 << 18,
+              itemsize: int = 8) -> int:
+    """
+    :param nCols: number of columns of the prototype matrix
+    :param blockbytes: size of a block, about that of a core's L2 cache
+    :param itemsize: bytes per element
+    returns the number of categories per block
+    """
+    return max(1, blockbytes//max(1, nCols*itemsize))
+
+
+def mapblocks(kernel: Callable[[int, int], Any],
+              nRows: int,
+              nthreads: int,
+              blocksize: int) -> None:
+    """
+    :param kernel: called with the bounds (start, stop) of every block
+            of categories, it writes its results in place
+    :param nRows: number of categories
+    :param nthreads: number of threads, the blocks run in the calling
+            thread when 1
+    :param blocksize: number of categories per block
+    NumPy releases the GIL inside its loops, so the blocks run in
+    parallel as long as the kernel is made of array operations.
+    """
+    bounds = [(start, min(nRows, start + blocksize))
+              for start in range(0, nRows, blocksize)]
+    if nthreads <= 1 or len(bounds) <= 1:
+        for (start, stop) in bounds:
+            kernel(start, stop)
+        return
+    for future in [threadpool(nthreads).submit(kernel, start, stop)
+                   for (start, stop) in bounds]:
+        future.result()
+
+
+def blockfuzzyand(weights: np.ndarray,
+                  input: Any,
+                  nthreads: int = 1,
+                  norms: Optional[np.ndarray] = None,
+                  rownorms: bool = False,
+                  blockbytes: int = 1 << 18) -> Any:
+    """
+    :param weights: prototype matrix of shape (K, D)
+    :param input: a sample of shape (D,) or a batch of shape (B, D), or
+            sparse samples (see sparsefuzzyand)
+    :param nthreads: number of threads
+    :param norms: halfnorms of weights, required for sparse inputs
+    :param rownorms: to also return |w|_1 of every prototype, summed
+            while its block is in cache
+    :param blockbytes: size of a block of prototypes
+    returns fuzzyand (sparsefuzzyand) of input, evaluated block by block
+    """
+    nCategories = weights.shape[0]
+    sums = np.empty(nCategories, dtype=weights.dtype) if rownorms else None
+    blocksize = blockrows(weights.shape[1], blockbytes, weights.itemsize)
+    if issparse(input):
+        input = sparserows(input)
+        out = np.empty((input.shape[0], nCategories), dtype=weights.dtype)
+
+        def kernel(start: int, stop: int) -> None:
+            out[:, start:stop] = sparsefuzzyand(weights[start:stop],
+                                                norms[start:stop],
+                                                input)
+            if rownorms:
+                sums[start:stop] = weights[start:stop].sum(axis=1)
+    else:
+        out = np.empty(input.shape[:-1] + (nCategories,),
+                       dtype=np.result_type(weights, input))
+
+        def kernel(start: int, stop: int) -> None:
+            out[..., start:stop] = fuzzyand(weights[start:stop], input)
+            if rownorms:
+                sums[start:stop] = weights[start:stop].sum(axis=1)
+
+    mapblocks(kernel, nCategories, nthreads, blocksize)
+    return (out, sums) if rownorms else out
+
+
+def blockdistance(centers: np.ndarray,
+                  input: np.ndarray,
+                  nthreads: int = 1,
+                  blockbytes: int = 1 << 18) -> np.ndarray:
+    """
+    :param centers: matrix of the category centers, of shape (K, d)
+    :param input: a sample of shape (d,) or a batch of shape (B, d)
+    :param nthreads: number of threads
+    :param blockbytes: size of a block of centers
+    returns the euclidean distance of input to every center, of shape
+    (K,) for a sample and (B, K) for a batch
+    """
+    nCategories = centers.shape[0]
+    input = np.asarray(input)
+    out = np.empty(input.shape[:-1] + (nCategories,),
+                   dtype=np.result_type(centers, input, float))
+    blocksize = blockrows(centers.shape[1], blockbytes, centers.itemsize)
+    if input.ndim > 1:
+        blocksize = max(1, blocksize//len(input))
+
+    def kernel(start: int, stop: int) -> None:
+        if input.ndim == 1:
+            difference = centers[start:stop] - input
+        else:
+            difference = centers[None, start:stop, :] - input[:, None, :]
+        out[..., start:stop] = np.sqrt(np.sum(difference**2, axis=-1))
+
+    mapblocks(kernel, nCategories, nthreads, blocksize)
+    return out
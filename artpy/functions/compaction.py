@@ -0,0 +1,146 @@
+"""
+    ARTPY: A Python library of Adaptive Resonance Theory based learning
+     models.
+
+     This file provides the containment tests and the merge resolution
+     used to compact the categories of the models.
+"""
+
+import typing
+from typing import Callable, Dict, Optional
+import numpy as np
+from .blockkernels import blockdistance
+
+
+def boxcontains(weights: np.ndarray,
+                start: int,
+                stop: int,
+                tol: float = 0.0,
+                minnorm: Optional[float] = None) -> np.ndarray:
+    """
+    :param weights: complement coded prototype matrix of shape (K, 2d)
+    :param start: first prototype tested as container
+    :param stop: one past the last prototype tested as container
+    :param tol: slack allowed on every side of the boxes
+    :param minnorm: smallest |w|_1 the hull of two boxes may have, e.g.
+            vigilance_*d, unless it is the container itself
+    returns whether the box of every prototype start to stop contains
+    that of every prototype, of shape (stop - start, K). A box w_i
+    contains w_j when w_i <= w_j elementwise.
+    """
+    block = weights[start:stop, None, :]
+    contains = np.all(block <= weights[None, :, :] + tol, axis=-1)
+    if minnorm is not None:
+        hull = np.minimum(block, weights[None, :, :]).sum(axis=-1)
+        contains &= (hull >= minnorm) | (hull == block.sum(axis=-1))
+    return contains
+
+
+def spherecontains(centers: np.ndarray,
+                   radii: np.ndarray,
+                   start: int,
+                   stop: int,
+                   tol: float = 0.0,
+                   maxradius: Optional[float] = None) -> np.ndarray:
+    """
+    :param centers: matrix of the category centers, of shape (K, d)
+    :param radii: radius of every category
+    :param start: first category tested as container
+    :param stop: one past the last category tested as container
+    :param tol: slack allowed on the radii
+    :param maxradius: largest radius the sphere enclosing two spheres
+            may have, e.g. (1 - vigilance_)*radialextend_, unless it is
+            the container itself
+    returns whether the sphere of every category start to stop contains
+    that of every category, of shape (stop - start, K)
+    """
+    extent = blockdistance(centers, centers[start:stop]) + radii[None, :]
+    contains = extent <= radii[start:stop, None] + tol
+    if maxradius is not None:
+        contains &= (extent <= maxradius) | (extent <= radii[start:stop, None])
+    return contains
+
+
+def mergeroots(size: np.ndarray,
+               contains: Callable[[int, int], np.ndarray],
+               rowbytes: int,
+               blockbytes: int = 1 << 26) -> np.ndarray:
+    """
+    :param size: size of every category, the larger ones absorb the
+            smaller ones and ties go to the lowest index
+    :param contains: returns, for the categories start to stop, whether
+            they contain every category (see boxcontains)
+    :param rowbytes: bytes of the intermediates contains needs per
+            category tested as container
+    :param blockbytes: size of the intermediates materialised at once
+    returns for every category the category it is merged into, itself
+    when it is kept. A category is merged into the largest category
+    containing it, chains being followed to the category that is kept.
+    """
+    nCategories = len(size)
+    order = np.lexsort((np.arange(nCategories), -np.asarray(size)))
+    rank = np.empty(nCategories, dtype=np.int64)
+    rank[order] = np.arange(nCategories)
+    best = np.full(nCategories, nCategories, dtype=np.int64)
+    step = max(1, blockbytes//max(1, rowbytes))
+    for start in range(0, nCategories, step):
+        stop = min(nCategories, start + step)
+        absorbs = contains(start, stop) & (rank[start:stop, None] < rank[None, :])
+        candidate = np.where(absorbs, rank[start:stop, None], nCategories)
+        np.minimum(best, candidate.min(axis=0), out=best)
+    root = np.where(best < nCategories, order[np.minimum(best, nCategories - 1)],
+                    np.arange(nCategories))
+    while True:
+        jumped = root[root]
+        if np.array_equal(jumped, root):
+            return root
+        root = jumped
+
+
+def admitmerges(root: np.ndarray,
+                admitted: Callable[[np.ndarray], np.ndarray],
+                cost: np.ndarray) -> np.ndarray:
+    """
+    :param root: the category every category is merged into, see
+            mergeroots
+    :param admitted: returns, for such an array, whether the category
+            merged from the group of every root passes the vigilance test
+    :param cost: how much every category grows the one absorbing it
+    returns root with the costliest member of every group failing the
+    test kept on its own, one at a time until every group passes. The
+    containment tests check pairs, a group merging several categories
+    may still fail as a whole.
+    """
+    index = np.arange(len(root))
+    while True:
+        failing = ~admitted(root)[root] & (root != index)
+        if not failing.any():
+            return root
+        members = np.flatnonzero(failing)
+        members = members[np.lexsort((-cost[members], root[members]))]
+        first = members[np.r_[True, root[members][1:] != root[members][:-1]]]
+        root = root.copy()
+        root[first] = first
+
+
+def compactionreport(before: int,
+                     after: int,
+                     reassigned: int = 0,
+                     changed: Optional[int] = None) -> Dict[str, float]:
+    """
+    :param before: number of categories before compaction
+    :param after: number of categories after compaction
+    :param reassigned: number of stored labels moved to the category
+            absorbing theirs
+    :param changed: number of the given inputs assigned to another
+            category than before, up to the renumbering, None when no
+            inputs were given
+    """
+    report = {"before": before,
+              "after": after,
+              "merged": before - after,
+              "reduction": (before - after)/before if before > 0 else 0.0,
+              "reassigned": reassigned}
+    if changed is not None:
+        report["changed"] = changed
+    return report
@@ -6,6 +6,7 @@
 """
 import typing
 import numpy as np
+from .sparseinput import issparse, sparserows
 
 def complementcoding(iNput: list,
                     dim: int = 0) -> list[np.ndarray]:
@@ -13,8 +14,24 @@ def complementcoding(iNput: list,
     """
     :param iNput: iNput data
     :param dim: dimension along with normalisation should be done
+    A non negative scipy.sparse input is only normalised, along dim 0,
+    and returned as a CSR array with its complement half left implicit,
+    as FuzzyART and TopoART accept it.
     """
 
+    if issparse(iNput):
+        if dim != 0:
+            raise ValueError("sparse iNput is normalised along dim 0 only")
+        normalised = sparserows(iNput).astype(float)
+        dim_max = normalised.max(axis=0).toarray().ravel()
+        dim_min = normalised.min(axis=0).toarray().ravel()
+        if np.any(dim_min < 0):
+            raise ValueError("expected non negative sparse iNput")
+        columns = normalised.indices
+        normalised.data = (normalised.data - dim_min[columns])/(dim_max - dim_min)[columns]
+        normalised.eliminate_zeros()
+        return normalised
+
     if isinstance(iNput,list):
         nSamples = len(iNput)
         tiNput = np.array(iNput)
@@ -8,15 +8,24 @@ import typing
 import numpy as np
 from . import *
 
-def computermax(input: Union[np.ndarray, List[np.ndarray]]) -> float:
+def computermax(input: Union[np.ndarray, List[np.ndarray]],
+                blocksize: int = 1 << 22) -> float:
+    """
+    :param input: the data, one observation per row
+    :param blocksize: maximum number of pairwise distances evaluated at once
+    returns half the largest distance between two observations
+    """
     if isinstance(input, list):
         input = np.array(input)
+    input = np.asarray(input, dtype=float)
 
     (nObs,nDim) = input.shape
-    RMax = 0
-    for i in range(nObs - 1):
-        for j in range(i+1, nObs):
-            dist = euclideandistance(input[i, :], input[j,:])
-            if dist > RMax:
-                RMax = dist
-    return RMax/2
+    sqnorms = np.sum(input**2, axis=1)
+    step = max(1, blocksize//max(1, nObs))
+    RMax = 0.0
+    for start in range(0, nObs, step):
+        stop = min(nObs, start + step)
+        dist = sqnorms[start:stop, None] + sqnorms[None, :] \
+            - 2*input[start:stop] @ input.T
+        RMax = max(RMax, float(dist.max()))
+    return float(np.sqrt(max(RMax, 0.0)))/2
@@ -0,0 +1,114 @@
+"""
+    ARTPY: A Python library of Adaptive Resonance Theory based learning
+     models.
+
+     This file provides the functions making training reproducible:
+     the process wide seed, the winner selection rule and the model
+     fingerprint.
+"""
+
+import typing
+import hashlib
+from typing import Any, Optional, Union
+import numpy as np
+
+_seed: Optional[int] = None
+
+
+def setseed(seed: Optional[int]) -> None:
+    """
+    :param seed: seed used by the models whenever they draw a
+            presentation order without being given a seed, None for
+            fresh entropy every time
+    """
+    global _seed
+    _seed = seed
+
+
+def getseed() -> Optional[int]:
+    return _seed
+
+
+def orderrng(seed: Optional[int] = None) -> np.random.Generator:
+    """
+    :param seed: seed of the generator, that of setseed when None
+    returns the generator drawing presentation orders
+    """
+    return np.random.default_rng(_seed if seed is None else seed)
+
+
+def selectwinner(T: np.ndarray,
+                 axis: Optional[int] = None) -> Union[int, np.ndarray]:
+    """
+    :param T: choice of every category, masked categories set below zero
+    :param axis: axis of the categories for a batch, None for a sample
+    returns the index of the category with the highest choice. Ties go
+    to the lowest index whatever the order in which blocks of categories
+    were evaluated. Eviction reuses indices, so that is not necessarily
+    the earliest created category.
+    """
+    if axis is None:
+        return int(np.argmax(T))
+    return np.argmax(T, axis=axis)
+
+
+def _hasharray(digest: Any,
+               name: str,
+               array: Any) -> None:
+    """
+    :param digest: the running hash
+    :param name: name of the array
+    :param array: array or list to be hashed with its dtype and shape
+    """
+    array = np.asarray(array)
+    if array.dtype.kind in "US":
+        array = array.astype(str)
+    else:
+        array = np.ascontiguousarray(array, dtype=array.dtype.newbyteorder("<"))
+    digest.update(f"{name}:{array.dtype.str}:{array.shape};".encode())
+    digest.update(array.tobytes())
+
+
+def _hashmodel(digest: Any,
+               model: Any,
+               labels: bool) -> None:
+    """
+    :param digest: the running hash
+    :param model: an ART model, or a hierarchy of them
+    :param labels: to also hash the labels of the presented samples
+    """
+    if hasattr(model, "moduleA_"):
+        for (name, module) in (("moduleA", model.moduleA_), ("moduleB", model.moduleB_)):
+            digest.update(f"{name};".encode())
+            _hashmodel(digest, module, labels)
+        if labels:
+            _hasharray(digest, "routed", np.asarray(model.getrouted(), dtype=np.int64))
+        return
+    if hasattr(model, "prototypes"):
+        _hasharray(digest, "prototypes", model.prototypes)
+    else:
+        for key in sorted(model.prototypes_):
+            _hasharray(digest, key, model.prototypes_[key])
+    if hasattr(model, "counter_"):
+        _hasharray(digest, "counter", model.counter_)
+    if hasattr(model, "edges_"):
+        _hasharray(digest, "edges", np.array(model.edges_, dtype=str).reshape(-1, 2))
+    if labels:
+        _hasharray(digest, "labels", np.asarray(model.getlabels(), dtype=np.int64))
+
+
+def fingerprint(model: Any,
+                labels: bool = False) -> str:
+    """
+    :param model: an ART model, or a HierarchicalTopoART whose modules
+            are hashed in turn
+    :param labels: to also hash the labels of the presented samples, and
+            which samples a hierarchy routed to module B
+    returns the SHA-256 of the categories (weights, centers, radii,
+    counters, tags) and edges of model, equal for two models only when
+    they hold bit identical categories, so that an optimised training
+    path can be checked against the reference one
+    """
+    digest = hashlib.sha256(type(model).__name__.encode())
+    _hashmodel(digest, model, labels)
+    return digest.hexdigest()
@@ -0,0 +1,33 @@
+"""
+    ARTPY: A Python library of Adaptive Resonance Theory based learning
+     models.
+
+     This file provides selectvictim function.
+"""
+
+import typing
+import numpy as np
+
+EVICTIONPOLICIES = ("lru", "count", "oldest")
+
+
+def selectvictim(policy: str,
+                 counter: np.ndarray,
+                 lasthit: np.ndarray,
+                 created: np.ndarray) -> int:
+    """
+    :param policy: "lru" evicts the least recently resonated category,
+            "count" the one that resonated the fewest times and
+            "oldest" the earliest created
+    :param counter: number of samples each category resonated with
+    :param lasthit: cycle at which each category last resonated
+    :param created: cycle at which each category was created
+    returns the index of the category to be evicted
+    """
+    if policy == "lru":
+        return int(np.argmin(lasthit))
+    if policy == "count":
+        return int(np.argmin(counter))
+    if policy == "oldest":
+        return int(np.argmin(created))
+    raise ValueError(f"expected policy in {EVICTIONPOLICIES}, got {policy}")
@@ -0,0 +1,35 @@
+"""
+    ARTPY: A Python library of Adaptive Resonance Theory based learning
+     models.
+
+     This file provides fuzzyand function.
+"""
+
+import typing
+from typing import List, Union
+import numpy as np
+
+
+def fuzzyand(weights: np.ndarray,
+             input: np.ndarray,
+             blocksize: int = 1 << 22) -> np.ndarray:
+    """
+    :param weights: prototype matrix of shape (K, D)
+    :param input: a sample of shape (D,) or a batch of shape (B, D)
+    :param blocksize: maximum number of elements of the (B, K, D)
+            intermediate materialised at once
+    returns |min(input, w)|_1 for every prototype w, of shape (K,) for a
+    sample and (B, K) for a batch
+    """
+    if input.ndim == 1:
+        return np.minimum(weights, input).sum(axis=1)
+
+    (nSamples, nDim) = input.shape
+    nCategories = weights.shape[0]
+    out = np.empty((nSamples, nCategories), dtype=np.result_type(weights, input))
+    step = max(1, blocksize//max(1, nCategories*nDim))
+    for start in range(0, nSamples, step):
+        stop = min(nSamples, start + step)
+        out[start:stop] = np.minimum(weights[None, :, :],
+                                     input[start:stop, None, :]).sum(axis=2)
+    return out
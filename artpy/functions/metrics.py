@@ -0,0 +1,172 @@
+"""
+    ARTPY: A Python library of Adaptive Resonance Theory based learning
+     models.
+
+     This file provides clustering quality metrics computed from per
+     category sufficient statistics and contingency tables.
+"""
+
+import typing
+from typing import Dict, Optional
+import numpy as np
+
+
+def contingency(labels: np.ndarray,
+                truth: np.ndarray) -> np.ndarray:
+    """
+    :param labels: predicted label of every sample
+    :param truth: ground truth label of every sample
+    returns the table counting the samples of every (label, truth) pair
+    """
+    (_, row) = np.unique(np.asarray(labels), return_inverse=True)
+    (_, col) = np.unique(np.asarray(truth), return_inverse=True)
+    nRows = row.max() + 1 if len(row) > 0 else 0
+    nCols = col.max() + 1 if len(col) > 0 else 0
+    table = np.bincount(row.ravel()*nCols + col.ravel(), minlength=nRows*nCols)
+    return table.reshape(nRows, nCols)
+
+
+def adjustedrandindex(table: np.ndarray) -> float:
+    """
+    :param table: contingency table of the labels and the ground truth
+    """
+    table = np.asarray(table, dtype=float)
+    n = table.sum()
+    pairs = (table*(table - 1)/2).sum()
+    rows = table.sum(axis=1)
+    cols = table.sum(axis=0)
+    rowpairs = (rows*(rows - 1)/2).sum()
+    colpairs = (cols*(cols - 1)/2).sum()
+    expected = rowpairs*colpairs/(n*(n - 1)/2) if n > 1 else 0.0
+    maximum = (rowpairs + colpairs)/2
+    if maximum == expected:
+        return 1.0
+    return float((pairs - expected)/(maximum - expected))
+
+
+def normalisedmutualinfo(table: np.ndarray) -> float:
+    """
+    :param table: contingency table of the labels and the ground truth
+    returns the mutual information normalised by the arithmetic mean of
+    the entropies
+    """
+    table = np.asarray(table, dtype=float)
+    n = table.sum()
+    if n == 0:
+        return 1.0
+    rows = table.sum(axis=1)/n
+    cols = table.sum(axis=0)/n
+    joint = table/n
+    nonzero = joint > 0
+    outer = np.outer(rows, cols)
+    mi = np.sum(joint[nonzero]*np.log(joint[nonzero]/outer[nonzero]))
+    hrows = -np.sum(rows[rows > 0]*np.log(rows[rows > 0]))
+    hcols = -np.sum(cols[cols > 0]*np.log(cols[cols > 0]))
+    if hrows == 0 and hcols == 0:
+        return 1.0
+    return float(max(mi, 0.0)/((hrows + hcols)/2))
+
+
+def scatter(counts: np.ndarray,
+            sums: np.ndarray,
+            sqsums: np.ndarray,
+            centres: np.ndarray) -> np.ndarray:
+    """
+    :param counts: number of samples of every category
+    :param sums: sum of the samples of every category
+    :param sqsums: sum of the squared norms of the samples of every
+            category
+    :param centres: centre of every category
+    returns the sum of squared distances of the samples of every category
+    to its centre
+    """
+    within = sqsums - 2*np.sum(centres*sums, axis=1) \
+        + counts*np.sum(centres**2, axis=1)
+    return np.maximum(within, 0.0)
+
+
+def daviesbouldin(counts: np.ndarray,
+                  sums: np.ndarray,
+                  sqsums: np.ndarray,
+                  centres: Optional[np.ndarray] = None) -> float:
+    """
+    :param counts: number of samples of every category
+    :param sums: sum of the samples of every category
+    :param sqsums: sum of the squared norms of the samples of every
+            category
+    :param centres: centre of every category, e.g. from boxcentres, the
+            mean of its samples when None
+    The dispersion of a category is the root mean squared distance of its
+    samples to the centre (q = 2 in Davies and Bouldin, 1979), which the
+    sufficient statistics determine exactly. Empty categories are ignored
+    and nan is returned for fewer than two categories.
+    """
+    used = counts > 0
+    counts = counts[used]
+    sums = sums[used]
+    sqsums = sqsums[used]
+    if len(counts) < 2:
+        return np.nan
+    centres = sums/counts[:, None] if centres is None else centres[used]
+    dispersion = np.sqrt(scatter(counts, sums, sqsums, centres)/counts)
+    sqnorms = np.sum(centres**2, axis=1)
+    separation = np.sqrt(np.maximum(sqnorms[:, None] + sqnorms[None, :]
+                                    - 2*centres @ centres.T, 0.0))
+    np.fill_diagonal(separation, np.inf)
+    ratio = (dispersion[:, None] + dispersion[None, :])/separation
+    return float(np.mean(np.max(ratio, axis=1)))
+
+
+def calinskiharabasz(counts: np.ndarray,
+                     sums: np.ndarray,
+                     sqsums: np.ndarray,
+                     centres: Optional[np.ndarray] = None) -> float:
+    """
+    :param counts: number of samples of every category
+    :param sums: sum of the samples of every category
+    :param sqsums: sum of the squared norms of the samples of every
+            category
+    :param centres: centre of every category, the mean of its samples
+            when None
+    Empty categories are ignored and nan is returned for fewer than two
+    categories.
+    """
+    used = counts > 0
+    counts = counts[used]
+    sums = sums[used]
+    sqsums = sqsums[used]
+    (k, n) = (len(counts), counts.sum())
+    if k < 2:
+        return np.nan
+    centres = sums/counts[:, None] if centres is None else centres[used]
+    mean = sums.sum(axis=0)/n
+    between = np.sum(counts*np.sum((centres - mean)**2, axis=1))
+    within = scatter(counts, sums, sqsums, centres).sum()
+    if within == 0:
+        return 1.0
+    return float(between*(n - k)/(within*(k - 1)))
+
+
+def categoryutilisation(counts: np.ndarray) -> Dict[str, float]:
+    """
+    :param counts: number of samples of every category
+    returns the fraction of categories holding at least one sample and
+    the entropy of the category sizes normalised by its maximum
+    """
+    counts = np.asarray(counts, dtype=float)
+    used = counts[counts > 0]
+    if len(used) == 0:
+        return {"used": 0.0, "entropy": 0.0}
+    p = used/used.sum()
+    entropy = -np.sum(p*np.log(p))
+    return {"used": len(used)/len(counts),
+            "entropy": float(entropy/np.log(len(counts))) if len(counts) > 1 else 1.0}
+
+
+def boxcentres(prototypes: np.ndarray) -> np.ndarray:
+    """
+    :param prototypes: complement coded fuzzy ART weights of shape (K, 2d)
+    returns the centres of the hyperboxes, of shape (K, d)
+    """
+    nDim = prototypes.shape[1]//2
+    return (prototypes[:, :nDim] + 1 - prototypes[:, nDim:])/2
@@ -0,0 +1,28 @@
+"""
+    ARTPY: A Python library of Adaptive Resonance Theory based learning
+     models.
+
+     This file provides savemodel and loadmodel functions.
+"""
+
+import pickle
+import typing
+from typing import Any
+
+
+def savemodel(model: Any,
+              path: str) -> None:
+    """
+    :param model: the ART model to be saved
+    :param path: file the model is written to
+    """
+    with open(path, "wb") as f:
+        pickle.dump(model, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def loadmodel(path: str) -> Any:
+    """
+    :param path: file written by savemodel
+    """
+    with open(path, "rb") as f:
+        return pickle.load(f)
@@ -0,0 +1,101 @@
+"""
+    ARTPY: A Python library of Adaptive Resonance Theory based learning
+     models.
+
+     This file provides the functions handling scipy.sparse inputs, whose
+     complement half is kept implicit: a sparse row a in [0, 1]^d stands
+     for the complement coded input [a, 1 - a].
+"""
+
+import typing
+from typing import Any
+import numpy as np
+
+try:
+    import scipy.sparse as _sparse
+except ImportError:
+    _sparse = None
+
+
+def issparse(input: Any) -> bool:
+    """
+    :param input: an input or a batch of inputs
+    returns whether input is a scipy.sparse matrix or array, False when
+    scipy is not installed
+    """
+    return _sparse is not None and _sparse.issparse(input)
+
+
+def sparserows(input: Any) -> Any:
+    """
+    :param input: a sparse sample of shape (d,) or (1, d), or a batch of
+            shape (B, d)
+    returns input as a canonical CSR array of shape (B, d)
+    """
+    if input.format == "csr" and input.ndim == 2 and input.has_canonical_format:
+        return input
+    if input.ndim == 1:
+        input = input.reshape(1, -1)
+    input = _sparse.csr_array(input)
+    input.sum_duplicates()
+    return input
+
+
+def halfnorms(weights: np.ndarray) -> np.ndarray:
+    """
+    :param weights: complement coded prototype matrix of shape (K, 2d)
+    returns the norms |u|_1 and |v|_1 of the halves of every prototype
+    w = [u, v], of shape (K, 2)
+    """
+    weights = np.asarray(weights)
+    return weights.reshape(weights.shape[:-1] + (2, -1)).sum(axis=-1)
+
+
+def densecomplement(input: Any) -> np.ndarray:
+    """
+    :param input: sparse sample(s) a in [0, 1]^d
+    returns the complement coded inputs [a, 1 - a], of shape (B, 2d)
+    """
+    dense = sparserows(input).toarray()
+    return np.concatenate((dense, 1 - dense), axis=1)
+
+
+def sparsefuzzyand(weights: np.ndarray,
+                   norms: np.ndarray,
+                   input: Any,
+                   blocksize: int = 1 << 22) -> np.ndarray:
+    """
+    :param weights: complement coded prototype matrix of shape (K, 2d)
+    :param norms: halfnorms of weights
+    :param input: sparse sample(s) a in [0, 1]^d, complement coding
+            implicit
+    :param blocksize: maximum number of elements of the (K, nnz)
+            intermediate materialised at once
+    returns |min([a, 1 - a], w)|_1 for every prototype w = [u, v], of
+    shape (B, K). Where a is zero min(a, u) is zero and min(1 - a, v) is
+    v, so the fuzzy AND is |v|_1 plus a correction over the nonzero
+    entries of a only, min(a, u) + min(1 - a, v) - v.
+    """
+    input = sparserows(input)
+    nDim = weights.shape[1]//2
+    (nSamples, nCategories) = (input.shape[0], weights.shape[0])
+    out = np.empty((nSamples, nCategories), dtype=np.result_type(weights, input.dtype))
+    out[:] = norms[:, 1]
+    indptr = input.indptr
+    limit = max(1, blocksize//max(1, nCategories))
+    start = 0
+    while start < nSamples:
+        stop = int(np.searchsorted(indptr, indptr[start] + limit, side="right")) - 1
+        stop = min(nSamples, max(stop, start + 1))
+        (first, last) = (indptr[start], indptr[stop])
+        if last > first:
+            cols = input.indices[first:last]
+            values = input.data[first:last]
+            U = weights[:, cols]
+            V = weights[:, nDim + cols]
+            correction = np.minimum(U, values) + np.minimum(V, 1 - values) - V
+            nonempty = np.flatnonzero(np.diff(indptr[start:stop + 1]) > 0)
+            sums = np.add.reduceat(correction, indptr[start + nonempty] - first, axis=1)
+            out[start + nonempty] += sums.T
+        start = stop
+    return out